@@ -0,0 +1,127 @@
+"""
+Timing and statistics helpers for the TELOS benchmarks.
+
+CLOCK_MONOTONIC_RAW is read straight from the vDSO and, unlike
+perf_counter_ns() (CLOCK_MONOTONIC), is never slewed by NTP, so
+back-to-back samples are not skewed by clock adjustments mid-run.
+
+LoopCounter wraps perf_event_open(2) so a whole N-iteration loop can be
+measured with one counter read instead of N clock reads.
+"""
+
+import ctypes
+import errno
+import fcntl
+import os
+import platform
+import statistics
+import struct
+import time
+from typing import Optional
+
+if hasattr(time, 'CLOCK_MONOTONIC_RAW'):
+    _CLOCK_ID = time.CLOCK_MONOTONIC_RAW
+else:
+    _CLOCK_ID = time.CLOCK_MONOTONIC
+
+_clock_gettime_ns = time.clock_gettime_ns
+
+
+def now_ns() -> int:
+    """Current raw monotonic time in nanoseconds."""
+    return _clock_gettime_ns(_CLOCK_ID)
+
+
+def summarize(samples: list) -> dict:
+    """
+    Summary statistics for a list of latency samples.
+
+    Sorts once and reads min/max/median/p99 by index instead of letting
+    statistics.median(), min(), max() and sorted() each walk the data.
+    """
+    ordered = sorted(samples)
+    n = len(ordered)
+    mid = n // 2
+    median = ordered[mid] if n % 2 else (ordered[mid - 1] + ordered[mid]) / 2
+    return {
+        "mean": statistics.fmean(ordered),
+        "median": median,
+        "stdev": statistics.stdev(ordered) if n > 1 else 0,
+        "min": ordered[0],
+        "max": ordered[-1],
+        "p99": ordered[int(n * 0.99)],
+    }
+
+
+# === PERF EVENTS ===
+
+_SYS_PERF_EVENT_OPEN = {'x86_64': 298, 'aarch64': 241}.get(platform.machine())
+
+PERF_TYPE_HARDWARE = 0
+PERF_TYPE_SOFTWARE = 1
+PERF_COUNT_HW_CPU_CYCLES = 0
+PERF_COUNT_SW_TASK_CLOCK = 1
+
+# _IO('$', n)
+_PERF_EVENT_IOC_ENABLE = 0x2400
+_PERF_EVENT_IOC_DISABLE = 0x2401
+_PERF_EVENT_IOC_RESET = 0x2403
+
+# perf_event_attr flag bits
+_ATTR_DISABLED = 1 << 0
+_ATTR_INHERIT = 1 << 1
+_ATTR_SIZE = 64  # PERF_ATTR_SIZE_VER0
+
+_COUNT = struct.Struct('q')
+
+
+def _perf_attr(type_: int, config: int) -> ctypes.Array:
+    """PERF_ATTR_SIZE_VER0 perf_event_attr, disabled, counting children."""
+    buf = ctypes.create_string_buffer(_ATTR_SIZE)
+    # type, size, config, sample_period, sample_type, read_format, flags
+    struct.pack_into('IIQQQQQ', buf, 0, type_, _ATTR_SIZE, config,
+                     0, 0, 0, _ATTR_DISABLED | _ATTR_INHERIT)
+    return buf
+
+
+class LoopCounter:
+    """
+    One perf counter around a whole benchmark loop.
+
+    inherit=1 folds in every child spawned while the counter is enabled,
+    so the count covers the execve() work as well as our own. Inherited
+    counts land once each child is reaped, which the benchmark loop
+    already does.
+    """
+
+    def __init__(self, fd: int):
+        self._fd = fd
+
+    @classmethod
+    def open(cls, type_: int, config: int) -> Optional['LoopCounter']:
+        """Open a counter for this process; None if perf events are unavailable."""
+        if _SYS_PERF_EVENT_OPEN is None:
+            return None
+        libc = ctypes.CDLL(None, use_errno=True)
+        attr = _perf_attr(type_, config)
+        # pid=0 (self), cpu=-1 (any), group_fd=-1, flags=0
+        fd = libc.syscall(_SYS_PERF_EVENT_OPEN, attr, 0, -1, -1, 0)
+        if fd < 0:
+            err = ctypes.get_errno()
+            if err not in (errno.EACCES, errno.EPERM, errno.ENOENT,
+                           errno.ENODEV, errno.EOPNOTSUPP, errno.ENOSYS):
+                raise OSError(err, os.strerror(err))
+            return None
+        return cls(fd)
+
+    def start(self) -> None:
+        fcntl.ioctl(self._fd, _PERF_EVENT_IOC_RESET, 0)
+        fcntl.ioctl(self._fd, _PERF_EVENT_IOC_ENABLE, 0)
+
+    def stop(self) -> int:
+        """Disable the counter and return its value."""
+        fcntl.ioctl(self._fd, _PERF_EVENT_IOC_DISABLE, 0)
+        return _COUNT.unpack(os.read(self._fd, _COUNT.size))[0]
+
+    def close(self) -> None:
+        os.close(self._fd)
@@ -0,0 +1,23 @@
+"""
+Shared Cortex gRPC connection for the TELOS benchmarks.
+
+grpc is imported on first use so scripts that only spawn processes run
+without it installed.
+"""
+
+CORTEX_ADDRESS = 'localhost:50051'
+
+_channel = None
+
+
+def cortex_stub():
+    """TelosControl stub on a channel shared across test phases."""
+    global _channel
+    import grpc
+    from shared import protocol_pb2_grpc
+
+    if _channel is None:
+        _channel = grpc.insecure_channel(CORTEX_ADDRESS, options=[
+            ('grpc.keepalive_time_ms', 10000),
+        ])
+    return protocol_pb2_grpc.TelosControlStub(_channel)
@@ -0,0 +1,119 @@
+"""
+Minimal process spawning for the TELOS benchmarks.
+
+subprocess.run() pays for pipe setup, Popen bookkeeping and output
+draining on every call, which swamps the execve() + LSM hook cost the
+benchmarks are trying to measure. These helpers go straight to
+posix_spawn(), or to a bare fork() + execve(), with stdout/stderr
+pointed at a shared /dev/null fd.
+"""
+
+import errno
+import mmap
+import os
+
+# Binary under test plus the loader and libc it maps on every exec
+PREFETCH_PATHS = [
+    "/bin/true",
+    "/lib64/ld-linux-x86-64.so.2",
+    "/lib/x86_64-linux-gnu/ld-linux-x86-64.so.2",
+    "/lib/x86_64-linux-gnu/libc.so.6",
+    "/lib64/libc.so.6",
+]
+
+# Exit status a forked child uses to report that execve() was denied
+EXIT_EXEC_DENIED = 126
+
+_devnull_fd = None
+
+
+def devnull_fd() -> int:
+    """
+    Return a process-wide /dev/null fd, opening it on first use.
+
+    Benchmark output is never inspected, so subprocess and posix_spawn()
+    callers point stdout/stderr at this fd instead of allocating pipes or
+    reopening /dev/null per call. Open it before forking and the children
+    inherit it.
+    """
+    global _devnull_fd
+    if _devnull_fd is None:
+        _devnull_fd = os.open(os.devnull, os.O_RDWR)
+    return _devnull_fd
+
+
+def spawn(argv: list) -> int:
+    """
+    Spawn argv[0] with no pipes and wait for it.
+
+    Returns the exit code. Raises PermissionError if the LSM denies the
+    execve() and FileNotFoundError if the binary does not exist.
+    """
+    fd = devnull_fd()
+    pid = os.posix_spawn(argv[0], argv, os.environ, file_actions=[
+        (os.POSIX_SPAWN_DUP2, fd, 1),
+        (os.POSIX_SPAWN_DUP2, fd, 2),
+    ])
+    _, status = os.waitpid(pid, 0)
+    return os.waitstatus_to_exitcode(status)
+
+
+def fork_exec(argv: list) -> int:
+    """
+    fork() + execve() argv[0] with an empty environment and wait for it.
+
+    Same contract as spawn(): returns the exit code and raises
+    PermissionError if the child's execve() was denied.
+    """
+    fd = devnull_fd()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            os.dup2(fd, 1)
+            os.dup2(fd, 2)
+            os.execve(argv[0], argv, {})
+        except PermissionError:
+            os._exit(EXIT_EXEC_DENIED)
+        except BaseException:
+            os._exit(127)
+    _, status = os.waitpid(pid, 0)
+    code = os.waitstatus_to_exitcode(status)
+    if code == EXIT_EXEC_DENIED:
+        raise PermissionError(errno.EPERM, "execve() denied", argv[0])
+    return code
+
+
+def fork_available() -> bool:
+    """Return True if this process is allowed to fork()."""
+    try:
+        pid = os.fork()
+    except OSError:
+        return False
+    if pid == 0:
+        os._exit(0)
+    os.waitpid(pid, 0)
+    return True
+
+
+def prefetch(paths: list = PREFETCH_PATHS) -> None:
+    """
+    Pull the exec'd binary and its shared libraries into the page cache.
+
+    Without this the first iterations pay for cold page-cache misses and
+    show up as a long p99 tail. Paths that do not exist are skipped.
+    """
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            size = os.fstat(fd).st_size
+            if size == 0:
+                continue
+            with mmap.mmap(fd, size, prot=mmap.PROT_READ) as mm:
+                mm.madvise(mmap.MADV_WILLNEED)
+                for offset in range(0, size, mmap.PAGESIZE):
+                    mm[offset]
+        finally:
+            os.close(fd)
@@ -4,35 +4,55 @@ Baseline benchmark - run this when TELOS Core is STOPPED to get true baseline.
 Then compare with lsm_bench.py results when Core is running.
 """
 
-import subprocess
-import time
-import statistics
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._clock import now_ns, summarize
+from benchmarks._spawn import fork_available, fork_exec, prefetch, spawn
 
 ITERATIONS = 1000
+WARMUP_ITERATIONS = 5
 COMMAND = ["/bin/true"]
 
 def main():
+    parser = argparse.ArgumentParser(description='TELOS baseline execve() benchmark')
+    parser.add_argument('--fork', action='store_true',
+                        help='Spawn with bare fork() + execve() instead of posix_spawn()')
+    use_fork = parser.parse_args().fork
+    
     print("╔═══════════════════════════════════════════════════════╗")
     print("║       BASELINE Benchmark (run with Core STOPPED)      ║")
     print("╚═══════════════════════════════════════════════════════╝")
     print()
     
-    # Warmup
-    for _ in range(100):
-        subprocess.run(COMMAND, capture_output=True)
+    # Same spawn path as lsm_bench.py so the numbers are comparable
+    if use_fork and fork_available():
+        run, method = fork_exec, "fork() + execve()"
+    else:
+        run, method = spawn, "posix_spawn() + execve()"
+    
+    # Warmup: page in the binary and loader, then a few runs for the rest
+    prefetch()
+    for _ in range(WARMUP_ITERATIONS):
+        run(COMMAND)
     
     # Measure
-    times = []
-    for _ in range(ITERATIONS):
-        start = time.perf_counter_ns()
-        subprocess.run(COMMAND, capture_output=True)
-        end = time.perf_counter_ns()
-        times.append((end - start) / 1000)  # µs
+    times = [0.0] * ITERATIONS
+    for i in range(ITERATIONS):
+        start = now_ns()
+        run(COMMAND)
+        end = now_ns()
+        times[i] = (end - start) / 1000  # µs
     
-    mean = statistics.mean(times)
-    median = statistics.median(times)
-    p99 = sorted(times)[int(len(times) * 0.99)]
+    stats = summarize(times)
+    mean = stats["mean"]
+    median = stats["median"]
+    p99 = stats["p99"]
     
+    print(f"Method:     {method}")
     print(f"Iterations: {ITERATIONS}")
     print(f"Mean:   {mean:,.1f} µs")
     print(f"Median: {median:,.1f} µs")
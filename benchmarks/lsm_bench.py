@@ -5,39 +5,82 @@ TELOS LSM Benchmark - Measure overhead of eBPF security hooks
 Measures execve() latency with and without taint tracking.
 """
 
+import argparse
 import os
 import sys
-import time
 import subprocess
-import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._clock import (
+    PERF_COUNT_HW_CPU_CYCLES, PERF_COUNT_SW_TASK_CLOCK,
+    PERF_TYPE_HARDWARE, PERF_TYPE_SOFTWARE,
+    LoopCounter, now_ns, summarize,
+)
+from benchmarks._spawn import fork_available, fork_exec, prefetch, spawn
 
 ITERATIONS = 1000
+WARMUP_ITERATIONS = 5
 COMMAND = ["/bin/true"]  # Minimal command for pure syscall overhead
 
-def benchmark_execve(label: str, iterations: int = ITERATIONS) -> dict:
-    """Benchmark subprocess spawn latency."""
-    times = []
+def benchmark_execve(label: str, iterations: int = ITERATIONS, run=spawn) -> dict:
+    """Benchmark spawn latency, starting each child with run(COMMAND)."""
+    times = [0.0] * iterations
     
-    for _ in range(iterations):
-        start = time.perf_counter_ns()
+    for i in range(iterations):
+        start = now_ns()
         try:
-            subprocess.run(COMMAND, capture_output=True, timeout=1)
-        except (PermissionError, subprocess.SubprocessError):
+            run(COMMAND)
+        except OSError:
             pass  # Count blocked attempts too
-        end = time.perf_counter_ns()
-        times.append((end - start) / 1000)  # Convert to µs
+        end = now_ns()
+        times[i] = (end - start) / 1000  # Convert to µs
     
+    stats = summarize(times)
     return {
         "label": label,
         "iterations": iterations,
-        "mean_us": statistics.mean(times),
-        "median_us": statistics.median(times),
-        "stdev_us": statistics.stdev(times) if len(times) > 1 else 0,
-        "min_us": min(times),
-        "max_us": max(times),
-        "p99_us": sorted(times)[int(len(times) * 0.99)],
+        "mean_us": stats["mean"],
+        "median_us": stats["median"],
+        "stdev_us": stats["stdev"],
+        "min_us": stats["min"],
+        "max_us": stats["max"],
+        "p99_us": stats["p99"],
     }
 
+def benchmark_loop(iterations: int = ITERATIONS, run=spawn) -> dict:
+    """
+    Whole-loop cost with no per-iteration clock reads.
+    
+    Task clock and CPU cycles (including the spawned children) are read
+    once around all iterations and divided by N. Counters the kernel or
+    hypervisor does not expose are reported as None.
+    """
+    counters = {
+        "task_clock_ns": LoopCounter.open(PERF_TYPE_SOFTWARE, PERF_COUNT_SW_TASK_CLOCK),
+        "cycles": LoopCounter.open(PERF_TYPE_HARDWARE, PERF_COUNT_HW_CPU_CYCLES),
+    }
+    active = [c for c in counters.values() if c is not None]
+    
+    for counter in active:
+        counter.start()
+    start = now_ns()
+    for _ in range(iterations):
+        try:
+            run(COMMAND)
+        except OSError:
+            pass
+    elapsed = now_ns() - start
+    
+    results = {"wall_us": elapsed / iterations / 1000}
+    for name, counter in counters.items():
+        if counter is None:
+            results[name] = None
+            continue
+        results[name] = counter.stop() / iterations
+        counter.close()
+    return results
+
 def print_results(results: dict):
     print(f"\n{'='*60}")
     print(f"  {results['label']}")
@@ -50,7 +93,24 @@ def print_results(results: dict):
     print(f"  Max:         {results['max_us']:,.1f} µs")
     print(f"  P99:         {results['p99_us']:,.1f} µs")
 
+def print_loop_results(results: dict):
+    print("\n  Whole-loop counters (per iteration):")
+    print(f"  Wall:        {results['wall_us']:,.1f} µs")
+    if results['task_clock_ns'] is not None:
+        print(f"  Task clock:  {results['task_clock_ns'] / 1000:,.1f} µs")
+    else:
+        print("  Task clock:  unavailable")
+    if results['cycles'] is not None:
+        print(f"  CPU cycles:  {results['cycles']:,.0f}")
+    else:
+        print("  CPU cycles:  unavailable")
+
 def main():
+    parser = argparse.ArgumentParser(description='TELOS LSM execve() benchmark')
+    parser.add_argument('--fork', action='store_true',
+                        help='Spawn with bare fork() + execve() instead of posix_spawn()')
+    use_fork = parser.parse_args().fork
+    
     print("╔═══════════════════════════════════════════════════════╗")
     print("║         TELOS LSM Performance Benchmark               ║")
     print("╚═══════════════════════════════════════════════════════╝")
@@ -73,20 +133,31 @@ def main():
         print("   Run without registering with Cortex for clean baseline")
         print()
     
+    # Both paths keep Python out of the child; posix_spawn() (vfork) avoids
+    # copying our page tables, so it is the default
+    if use_fork and fork_available():
+        run, label = fork_exec, "fork() + execve() with TELOS LSM active"
+    else:
+        run, label = spawn, "posix_spawn() + execve() with TELOS LSM active"
+    
     # Warmup
     print("[*] Warming up...")
-    for _ in range(100):
+    prefetch()
+    for _ in range(WARMUP_ITERATIONS):
         try:
-            subprocess.run(COMMAND, capture_output=True, timeout=1)
-        except:
+            run(COMMAND)
+        except OSError:
             pass
     
     # Benchmark
     print(f"[*] Running {ITERATIONS} iterations...")
-    results = benchmark_execve("execve() with TELOS LSM active")
+    results = benchmark_execve(label, run=run)
     
     print_results(results)
     
+    print(f"[*] Running {ITERATIONS} iterations under perf counters...")
+    print_loop_results(benchmark_loop(run=run))
+    
     # Calculate overhead estimate
     # Baseline execve on modern Linux is ~300-500µs for fork+exec
     baseline_estimate = 400  # µs, typical
@@ -6,10 +6,14 @@ This test runs common system commands that should ALWAYS succeed,
 even when TELOS Core is active. If any of these fail, there's a bug.
 """
 
+import asyncio
 import os
-import subprocess
 import sys
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._spawn import devnull_fd
+
 # Commands that should ALWAYS work (never registered with TELOS)
 SAFE_COMMANDS = [
     ["/bin/true"],
@@ -22,6 +26,30 @@ SAFE_COMMANDS = [
     ["/bin/pwd"],
 ]
 
+CMD_TIMEOUT = 5  # Seconds; a hung command is reported, not waited on forever
+
+async def _check(cmd: list) -> int:
+    """
+    Run one command with output discarded and return its exit code.
+    
+    Raises TimeoutError, after killing the command, if it runs longer
+    than CMD_TIMEOUT.
+    """
+    fd = devnull_fd()
+    proc = await asyncio.create_subprocess_exec(*cmd, stdout=fd, stderr=fd)
+    try:
+        await asyncio.wait_for(proc.communicate(), timeout=CMD_TIMEOUT)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise TimeoutError(f"timed out after {CMD_TIMEOUT} seconds")
+    return proc.returncode
+
+async def _check_all() -> list:
+    """Run every safe command concurrently; exceptions are returned in place."""
+    return await asyncio.gather(*(_check(cmd) for cmd in SAFE_COMMANDS),
+                                return_exceptions=True)
+
 def main():
     print("╔═══════════════════════════════════════════════════════╗")
     print("║         TELOS System Safety Verification              ║")
@@ -34,21 +62,29 @@ def main():
     failed = 0
     blocked = 0
     
-    for cmd in SAFE_COMMANDS:
+    # The commands are independent, so their fork/exec latency overlaps
+    results = asyncio.run(_check_all())
+    
+    for cmd, result in zip(SAFE_COMMANDS, results):
         cmd_str = " ".join(cmd)
         try:
-            result = subprocess.run(cmd, capture_output=True, timeout=5)
-            if result.returncode == 0:
+            if isinstance(result, BaseException):
+                raise result
+            returncode = result
+            if returncode == 0:
                 print(f"  ✅ {cmd_str}")
                 passed += 1
             else:
-                print(f"  ⚠️  {cmd_str} (exit code {result.returncode})")
+                print(f"  ⚠️  {cmd_str} (exit code {returncode})")
                 failed += 1
         except PermissionError:
             print(f"  ❌ {cmd_str} - BLOCKED!")
             blocked += 1
         except FileNotFoundError:
             print(f"  ⏭️  {cmd_str} - not found (skipped)")
+        except TimeoutError as e:
+            print(f"  ❌ {cmd_str} - TIMEOUT ({e})")
+            failed += 1
         except Exception as e:
             print(f"  ❌ {cmd_str} - {e}")
             failed += 1
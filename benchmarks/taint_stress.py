@@ -16,17 +16,19 @@ import multiprocessing
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from benchmarks._grpc import cortex_stub
+from benchmarks._spawn import devnull_fd
+
 ITERATIONS = 200
 
+_DN = devnull_fd()
+
 def run_as_tainted_agent():
     """Register, get tainted, then try to spawn commands."""
-    import grpc
-    from shared import protocol_pb2, protocol_pb2_grpc
+    from shared import protocol_pb2
     
     my_pid = os.getpid()
-    
-    channel = grpc.insecure_channel('localhost:50051')
-    stub = protocol_pb2_grpc.TelosControlStub(channel)
+    stub = cortex_stub()
     
     # Register as agent
     intent = protocol_pb2.IntentRequest(
@@ -55,7 +57,7 @@ def run_as_tainted_agent():
     
     for _ in range(ITERATIONS):
         try:
-            result = subprocess.run(["/bin/true"], capture_output=True, timeout=1)
+            result = subprocess.run(["/bin/true"], stdout=_DN, stderr=_DN)
             if result.returncode == 0:
                 allowed += 1
         except PermissionError:
@@ -70,7 +72,7 @@ def run_clean():
     successes = 0
     for _ in range(ITERATIONS):
         try:
-            result = subprocess.run(["/bin/true"], capture_output=True, timeout=1)
+            result = subprocess.run(["/bin/true"], stdout=_DN, stderr=_DN)
             if result.returncode == 0:
                 successes += 1
         except:
@@ -135,7 +137,7 @@ def main():
     for _ in range(50):
         try:
             # This runs in a NEW process that isn't tainted
-            result = subprocess.run(["/bin/true"], capture_output=True, timeout=1)
+            result = subprocess.run(["/bin/true"], stdout=_DN, stderr=_DN)
             if result.returncode == 0:
                 clean_after += 1
         except PermissionError:
@@ -14,27 +14,39 @@ import sys
 import time
 import threading
 import subprocess
+import itertools
 import multiprocessing
-from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from collections import deque
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from benchmarks._grpc import cortex_stub
+from benchmarks._spawn import devnull_fd, spawn
+
 # Test parameters
 SPAWN_ITERATIONS = 500
 CONCURRENT_WORKERS = 16
 TAINT_UPDATE_RATE = 100  # updates per second
 TEST_DURATION = 10  # seconds
+TAINT_BATCH_SIZE = 100  # distinct prebuilt reports to cycle through
+
+_DN = devnull_fd()  # Opened at import, so forked workers inherit it
 
-def spawn_worker(worker_id: int) -> dict:
-    """Worker that spawns subprocesses rapidly."""
+def spawn_worker(worker_id: int, counters) -> None:
+    """
+    Worker that spawns subprocesses rapidly.
+    
+    Runs in a forked child and records successes/failures/blocked in its
+    own three slots of the shared counters array.
+    """
     successes = 0
     failures = 0
     blocked = 0
+    argv = ["/bin/true"]
     
     for _ in range(SPAWN_ITERATIONS // CONCURRENT_WORKERS):
         try:
-            result = subprocess.run(["/bin/true"], capture_output=True, timeout=1)
-            if result.returncode == 0:
+            if spawn(argv) == 0:
                 successes += 1
             else:
                 failures += 1
@@ -43,33 +55,92 @@ def spawn_worker(worker_id: int) -> dict:
         except Exception:
             failures += 1
     
-    return {"worker": worker_id, "successes": successes, "failures": failures, "blocked": blocked}
+    base = worker_id * 3
+    counters[base] = successes
+    counters[base + 1] = failures
+    counters[base + 2] = blocked
+
+def run_spawn_workers() -> list:
+    """Fork CONCURRENT_WORKERS spawn workers, wait for all, collect counters."""
+    # Each worker writes only its own slots, so no lock is needed
+    counters = multiprocessing.Array('i', 3 * CONCURRENT_WORKERS, lock=False)
+    
+    pids = []
+    for worker_id in range(CONCURRENT_WORKERS):
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                spawn_worker(worker_id, counters)
+                code = 0
+            finally:
+                os._exit(code)
+        pids.append(pid)
+    
+    for _ in pids:
+        os.waitpid(-1, 0)
+    
+    return [
+        {
+            "worker": i,
+            "successes": counters[i * 3],
+            "failures": counters[i * 3 + 1],
+            "blocked": counters[i * 3 + 2],
+        }
+        for i in range(CONCURRENT_WORKERS)
+    ]
 
 def taint_updater():
     """Rapidly update taint via gRPC (if Cortex running)."""
     try:
         import grpc
-        from shared import protocol_pb2, protocol_pb2_grpc
+        from shared import protocol_pb2
         
-        channel = grpc.insecure_channel('localhost:50051')
-        stub = protocol_pb2_grpc.TelosControlStub(channel)
+        stub = cortex_stub()
+        report = stub.ReportTaint.future
         
-        updates = 0
-        start = time.time()
+        # Built once and cycled through; the stub only serializes a message,
+        # so the same instances can be resent without copying
+        reports = itertools.cycle([
+            protocol_pb2.TaintReport(
+                source_id=f"stress_test_{i}",
+                url="http://stress.test/page",
+                level=(i % 4) + 1,  # Cycle through levels
+                payload_preview="stress test payload"
+            )
+            for i in range(TAINT_BATCH_SIZE)
+        ])
         
-        while time.time() - start < TEST_DURATION:
+        def delivered(call) -> int:
             try:
-                taint = protocol_pb2.TaintReport(
-                    source_id=f"stress_test_{updates % 100}",
-                    url="http://stress.test/page",
-                    level=(updates % 4) + 1,  # Cycle through levels
-                    payload_preview="stress test payload"
-                )
-                stub.ReportTaint(taint, timeout=0.1)
-                updates += 1
-            except:
-                pass
-            time.sleep(1.0 / TAINT_UPDATE_RATE)
+                call.result()
+                return 1
+            except grpc.RpcError:
+                return 0
+        
+        # Fixed-rate schedule: each send is due one period after the last
+        # deadline, not after the last RPC, so call latency can't drag the
+        # achieved rate below TAINT_UPDATE_RATE
+        period = 1.0 / TAINT_UPDATE_RATE
+        in_flight = deque()
+        updates = 0
+        now = time.perf_counter()
+        end = now + TEST_DURATION
+        next_deadline = now + period
+        
+        while now < end:
+            in_flight.append(report(next(reports), timeout=0.5))
+            while in_flight and in_flight[0].done():
+                updates += delivered(in_flight.popleft())
+            
+            sleep_for = next_deadline - time.perf_counter()
+            if sleep_for > 0:
+                time.sleep(sleep_for)
+            next_deadline += period
+            now = time.perf_counter()
+        
+        while in_flight:
+            updates += delivered(in_flight.popleft())
         
         return updates
     except ImportError:
@@ -92,9 +163,7 @@ def main():
     
     start = time.time()
     
-    with ThreadPoolExecutor(max_workers=CONCURRENT_WORKERS) as executor:
-        futures = [executor.submit(spawn_worker, i) for i in range(CONCURRENT_WORKERS)]
-        results = [f.result() for f in futures]
+    results = run_spawn_workers()
     
     elapsed = time.time() - start
     
@@ -115,7 +184,8 @@ def main():
     print("[TEST 2] Rapid taint updates via gRPC")
     print("=" * 60)
     
-    taint_thread = threading.Thread(target=taint_updater)
+    taint_updates = []
+    taint_thread = threading.Thread(target=lambda: taint_updates.append(taint_updater()))
     taint_thread.start()
     
     # Concurrent spawns during taint updates
@@ -125,7 +195,7 @@ def main():
     
     while time.time() - spawn_start < TEST_DURATION:
         try:
-            result = subprocess.run(["/bin/true"], capture_output=True, timeout=1)
+            result = subprocess.run(["/bin/true"], stdout=_DN, stderr=_DN, timeout=1)
             if result.returncode == 0:
                 spawn_during_taint += 1
         except PermissionError:
@@ -135,6 +205,9 @@ def main():
     
     taint_thread.join()
     
+    delivered_updates = taint_updates[0] if taint_updates else 0
+    print(f"  Taint updates delivered:    {delivered_updates} "
+          f"({delivered_updates / TEST_DURATION:.0f}/sec, target {TAINT_UPDATE_RATE}/sec)")
     print(f"  Spawns during taint storm:  {spawn_during_taint}")
     print(f"  Blocked during taint storm: {blocked_during_taint}")
     print(f"  Spawn rate:                 {spawn_during_taint / TEST_DURATION:.0f}/sec")
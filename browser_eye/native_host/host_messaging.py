@@ -15,6 +15,11 @@ import sys
 import json
 import os
 import logging
+import logging.handlers
+import queue
+import signal
+import time
+from collections import deque
 from typing import Optional, Dict, Any
 
 # Add parent directories to path for imports
@@ -27,10 +32,29 @@ try:
 except ImportError:
     GRPC_AVAILABLE = False
 
+from shared.taint_ring import TaintRingWriter
+
+# orjson parses straight from the read buffer and emits bytes; fall back to
+# the stdlib codec when it is not installed
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    def _json_loads(buf) -> Any:
+        return json.loads(bytes(buf))
+
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+
 # === CONFIGURATION ===
 
 CORTEX_ADDRESS = 'localhost:50051'
 LOG_FILE = '/tmp/telos_native_host.log'
+MAX_MESSAGE_SIZE = 1024 * 1024  # 1MB, Chrome's host-bound limit
+MAX_PENDING_REPORTS = 256  # In-flight ReportTaint calls before we block
+LOG_BUFFER_SIZE = 64 * 1024  # Log file write buffer
+RING_RETRY_INTERVAL = 5.0  # Seconds between attempts to attach the taint ring
 
 # Map string levels to protobuf enum
 TAINT_LEVEL_MAP = {
@@ -40,50 +64,146 @@ TAINT_LEVEL_MAP = {
     'HIGH': 3,
     'CRITICAL': 4
 }
+_taint_level_of = TAINT_LEVEL_MAP.get
 
 # === LOGGING ===
 
-logging.basicConfig(
-    filename=LOG_FILE,
-    level=logging.DEBUG,
-    format='%(asctime)s [%(levelname)s] %(message)s'
-)
+# Log calls only enqueue; a QueueListener thread started in main() does the
+# file I/O so the message loop never blocks on write(2).
+_log_queue = queue.SimpleQueue()
+logging.getLogger().addHandler(logging.handlers.QueueHandler(_log_queue))
+logging.getLogger().setLevel(logging.INFO)
 log = logging.getLogger('telos_native')
 
 
+class _BufferedFileHandler(logging.FileHandler):
+    """
+    FileHandler that lets the stream buffer routine records.
+    
+    WARNING and above are flushed at once: the browser kills native hosts
+    with SIGTERM/SIGKILL, and the line saying why the host failed is the
+    one that must reach the file.
+    """
+    
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=LOG_BUFFER_SIZE,
+                    encoding=self.encoding, errors=self.errors)
+    
+    def emit(self, record):
+        # StreamHandler.emit() without its unconditional flush()
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(self.format(record) + self.terminator)
+            if record.levelno >= logging.WARNING:
+                self.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+
+def start_log_listener() -> logging.handlers.QueueListener:
+    """Start the background thread that writes queued records to LOG_FILE."""
+    handler = _BufferedFileHandler(LOG_FILE)
+    handler.setFormatter(logging.Formatter('%(asctime)s [%(levelname)s] %(message)s'))
+    listener = logging.handlers.QueueListener(_log_queue, handler)
+    listener.start()
+    return listener
+
+
+def stop_log_listener(listener: logging.handlers.QueueListener) -> None:
+    """Drain queued records and close the log file."""
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
+
 # === NATIVE MESSAGING PROTOCOL ===
 
+class _StdinFrames:
+    """
+    Length-prefixed frame reader on the raw stdin fd.
+    
+    Reads straight into one reusable buffer with read(2), bypassing
+    BufferedReader and its lock. A single read can pick up several
+    queued messages, which are then parsed without further syscalls.
+    """
+    
+    def __init__(self, raw):
+        self._raw = raw
+        self._buf = bytearray(4 + MAX_MESSAGE_SIZE)
+        self._view = memoryview(self._buf)
+        self._start = 0  # First unconsumed byte
+        self._end = 0    # End of buffered data
+    
+    def buffered(self) -> int:
+        return self._end - self._start
+    
+    def fill(self, need: int) -> bool:
+        """Buffer at least `need` unconsumed bytes. Returns False on EOF."""
+        if self._end - self._start >= need:
+            return True
+        if self._start + need > len(self._buf):
+            # Move the partial frame to the front to make room
+            pending = self._end - self._start
+            self._buf[:pending] = self._view[self._start:self._end]
+            self._start, self._end = 0, pending
+        while self._end - self._start < need:
+            n = self._raw.readinto(self._view[self._end:])
+            if not n:
+                return False
+            self._end += n
+        return True
+    
+    def peek_length(self) -> int:
+        # Native unsigned int (little-endian on most systems)
+        return struct.unpack_from('@I', self._buf, self._start)[0]
+    
+    def take(self, n: int) -> memoryview:
+        """Consume n bytes; the view is valid until the next fill()."""
+        view = self._view[self._start:self._start + n]
+        self._start += n
+        return view
+
+
+_stdin_frames = _StdinFrames(sys.stdin.buffer.raw)
+_STDOUT_FD = sys.stdout.fileno()
+_OUT_HDR = bytearray(4)
+
+
 def read_message() -> Optional[Dict[str, Any]]:
     """
     Read a message from Chrome using Native Messaging protocol.
     Format: 4-byte little-endian length prefix + JSON payload
     """
     try:
+        frames = _stdin_frames
+        
         # Read 4-byte length prefix
-        raw_length = sys.stdin.buffer.read(4)
-        if len(raw_length) == 0:
-            log.info("Chrome closed connection (EOF)")
-            return None
-        if len(raw_length) != 4:
-            log.error(f"Invalid length prefix: got {len(raw_length)} bytes")
+        if not frames.fill(4):
+            n = frames.buffered()
+            if n == 0:
+                log.info("Chrome closed connection (EOF)")
+            else:
+                log.error(f"Invalid length prefix: got {n} bytes")
             return None
         
-        # Unpack as native unsigned int (little-endian on most systems)
-        msg_length = struct.unpack('@I', raw_length)[0]
+        msg_length = frames.peek_length()
         
         # Sanity check
-        if msg_length > 1024 * 1024:  # 1MB limit
+        if msg_length > MAX_MESSAGE_SIZE:
             log.error(f"Message too large: {msg_length} bytes")
             return None
         
         # Read JSON payload
-        msg_bytes = sys.stdin.buffer.read(msg_length)
-        if len(msg_bytes) != msg_length:
-            log.error(f"Incomplete message: expected {msg_length}, got {len(msg_bytes)}")
+        if not frames.fill(4 + msg_length):
+            log.error(f"Incomplete message: expected {msg_length}, got {frames.buffered() - 4}")
             return None
+        frames.take(4)
         
-        msg = json.loads(msg_bytes.decode('utf-8'))
-        log.debug(f"Received: {msg}")
+        msg = _json_loads(frames.take(msg_length))
+        log.debug("Received: %s", msg)
         return msg
         
     except json.JSONDecodeError as e:
@@ -97,16 +217,22 @@ def read_message() -> Optional[Dict[str, Any]]:
 def send_message(msg: Dict[str, Any]) -> bool:
     """
     Send a message to Chrome using Native Messaging protocol.
+    
+    Header and payload go out in one writev(2) on the raw stdout fd.
     """
     try:
-        encoded = json.dumps(msg).encode('utf-8')
-        length = struct.pack('@I', len(encoded))
+        encoded = _json_dumps(msg)
+        struct.pack_into('@I', _OUT_HDR, 0, len(encoded))
         
-        sys.stdout.buffer.write(length)
-        sys.stdout.buffer.write(encoded)
-        sys.stdout.buffer.flush()
+        total = 4 + len(encoded)
+        written = os.writev(_STDOUT_FD, [_OUT_HDR, encoded])
+        if written < total:
+            # Rare partial write on a full pipe: finish the frame
+            rest = memoryview(bytes(_OUT_HDR) + encoded)[written:]
+            while rest:
+                rest = rest[os.write(_STDOUT_FD, rest):]
         
-        log.debug(f"Sent: {msg}")
+        log.debug("Sent: %s", msg)
         return True
         
     except Exception as e:
@@ -117,61 +243,128 @@ def send_message(msg: Dict[str, Any]) -> bool:
 # === GRPC CLIENT ===
 
 class CortexClient:
-    """gRPC client to communicate with Telos Cortex"""
+    """
+    Client to communicate with Telos Cortex.
+    
+    Taint reports go through the shared-memory taint ring when Cortex has
+    one open, and over gRPC otherwise.
+    """
     
     def __init__(self, address: str):
         self.address = address
         self.channel = None
         self.stub = None
+        self._report_future = None  # Bound stub.ReportTaint.future
+        # (future, level, url) for ReportTaint calls still in flight
+        self._pending = deque()
+        self._ring: Optional[TaintRingWriter] = None
+        self._ring_retry_at = 0.0
         
     def connect(self) -> bool:
-        """Establish gRPC connection"""
+        """Attach the taint ring and establish gRPC connection"""
+        self._attach_ring()
+        
         if not GRPC_AVAILABLE:
             log.warning("gRPC not available - running in standalone mode")
-            return False
+            return self._ring is not None
             
         try:
             self.channel = grpc.insecure_channel(self.address)
             self.stub = protocol_pb2_grpc.TelosControlStub(self.channel)
+            self._report_future = self.stub.ReportTaint.future
             log.info(f"Connected to Cortex at {self.address}")
             return True
         except Exception as e:
             log.error(f"Failed to connect to Cortex: {e}")
             return False
     
+    def _attach_ring(self) -> None:
+        """(Re)attach the taint ring, at most once per RING_RETRY_INTERVAL."""
+        now = time.monotonic()
+        if now < self._ring_retry_at:
+            return
+        self._ring_retry_at = now + RING_RETRY_INTERVAL
+        
+        if self._ring is not None:
+            self._ring.close()
+        self._ring = TaintRingWriter.attach()
+        if self._ring is not None:
+            log.info("Attached to Cortex taint ring")
+    
     def report_taint(self, source_id: str, url: str, level: str, payload: str) -> bool:
-        """Send taint report to Cortex"""
-        if not self.stub:
-            log.warning("Not connected to Cortex - dropping taint report")
-            return False
+        """
+        Send taint report to Cortex without waiting for the reply.
         
+        Prefers the taint ring. Over gRPC, returns True once the RPC is in
+        flight; the outcome is logged when the call is reaped by drain(). If
+        MAX_PENDING_REPORTS calls are outstanding, waits for the oldest one
+        first.
+        """
         try:
             # Map level string to enum value
-            level_value = TAINT_LEVEL_MAP.get(level, 0)
+            level_value = _taint_level_of(level, 0)
+            preview = payload[:64] if payload else ''
+            
+            ring = self._ring
+            if ring is None:
+                self._attach_ring()
+                ring = self._ring
+            if ring is not None:
+                if ring.push(source_id, url, level_value, preview):
+                    log.debug("Taint queued on ring: %s at %s", level, url)
+                    return True
+                # Full, closed or replaced by a restarted Cortex: re-attach
+                # (at once if replaced) and use gRPC for this report
+                if ring.replaced():
+                    self._ring_retry_at = 0.0
+                self._attach_ring()
+            
+            if not self.stub:
+                log.warning("Not connected to Cortex - dropping taint report")
+                return False
             
             request = protocol_pb2.TaintReport(
                 source_id=source_id,
                 url=url,
                 level=level_value,
-                payload_preview=payload[:64] if payload else ''
+                payload_preview=preview
             )
             
-            # Non-blocking: fire and forget for responsiveness
-            # In production, this should be async or queued
-            response = self.stub.ReportTaint(request, timeout=5.0)
+            # Backpressure: never hold more than MAX_PENDING_REPORTS calls
+            if len(self._pending) >= MAX_PENDING_REPORTS:
+                self._reap(*self._pending.popleft())
             
-            log.info(f"Taint reported: {level} at {url} -> {response.success}")
-            return response.success
+            call = self._report_future(request, timeout=5.0)
+            self._pending.append((call, level, url))
+            return True
             
+        except Exception as e:
+            log.error(f"Report error: {e}")
+            return False
+    
+    def drain(self) -> None:
+        """Reap ReportTaint calls that have already completed."""
+        pending = self._pending
+        while pending and pending[0][0].done():
+            self._reap(*pending.popleft())
+    
+    def _reap(self, call, level: str, url: str) -> None:
+        """Wait for a ReportTaint call and log its outcome."""
+        try:
+            response = call.result()
+            log.info(f"Taint reported: {level} at {url} -> {response.success}")
         except grpc.RpcError as e:
             log.error(f"gRPC error: {e.code()} - {e.details()}")
-            return False
         except Exception as e:
             log.error(f"Report error: {e}")
-            return False
     
     def close(self):
-        """Close gRPC channel"""
+        """Wait for in-flight reports, then close the ring and gRPC channel"""
+        while self._pending:
+            self._reap(*self._pending.popleft())
+        if self._ring is not None:
+            self._ring.close()
+            self._ring = None
         if self.channel:
             self.channel.close()
             log.info("Cortex connection closed")
@@ -179,7 +372,14 @@ class CortexClient:
 
 # === MAIN LOOP ===
 
+def _on_sigterm(signum, frame):
+    # Unwind through main()'s finally so the log buffer is written out
+    raise SystemExit(128 + signum)
+
+
 def main():
+    listener = start_log_listener()
+    signal.signal(signal.SIGTERM, _on_sigterm)
     log.info("=" * 50)
     log.info("Telos Native Host starting...")
     
@@ -221,7 +421,8 @@ def main():
                 success = True
                 log.warning(f"[STANDALONE] Would report taint: {level} at {url}")
             
-            # Acknowledge to Chrome
+            # Acknowledge to Chrome (optimistically, before Cortex replies)
+            cortex.drain()
             send_message({
                 'type': 'ack',
                 'success': success,
@@ -239,6 +440,7 @@ def main():
     finally:
         cortex.close()
         log.info("Telos Native Host exiting")
+        stop_log_listener(listener)
 
 
 if __name__ == '__main__':
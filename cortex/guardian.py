@@ -13,19 +13,21 @@ import time
 from typing import Dict, Optional, Set
 from dataclasses import dataclass, field
 
+from shared import protocol_pb2
+
 log = logging.getLogger('telos.guardian')
 
 
-@dataclass
+@dataclass(slots=True)
 class TaintRecord:
     """Record of taint for a specific source/view."""
     source_id: str
     level: int
     url: str
-    timestamp: float = field(default_factory=time.time)
+    timestamp: float = field(default_factory=time.monotonic)  # For ages only, not wall time
 
 
-@dataclass
+@dataclass(slots=True)
 class AgentInfo:
     """Information about a registered agent."""
     pid: int
@@ -48,12 +50,22 @@ class Guardian:
     def __init__(self, policy: dict):
         self.policy = policy
         
+        # Policy knobs read on hot paths
+        self._max_taint_for_exec = int(policy.get('max_taint_for_exec', 2))  # Default: MEDIUM
+        
+        # GetPolicy answer; the policy is fixed until a reload rebuilds it
+        self._policy_rules = self._build_policy_rules(policy)
+        
         # Agent registry: PID -> AgentInfo
         self.agents: Dict[int, AgentInfo] = {}
         
         # Active agent (for simple Phase 2 model)
         self.active_agent_pid: Optional[int] = None
         
+        # The only registered agent's PID, or None unless exactly one is
+        # registered; every view then resolves to it
+        self._single_agent_fast: Optional[int] = None
+        
         # Taint records: source_id -> TaintRecord
         self.taint_records: Dict[str, TaintRecord] = {}
         
@@ -77,6 +89,7 @@ class Guardian:
         
         self.agents[pid] = AgentInfo(pid=pid)
         self.active_agent_pid = pid  # Most recent becomes active
+        self._update_single_agent_fast()
         
         log.info(f"[+] Agent registered: PID {pid}")
         return True
@@ -86,23 +99,31 @@ class Guardian:
         if pid not in self.agents:
             return False
         
-        del self.agents[pid]
+        agent = self.agents.pop(pid)
         
-        # Update active agent
+        # Update active agent (dicts keep insertion order)
         if self.active_agent_pid == pid:
             if self.agents:
-                self.active_agent_pid = list(self.agents.keys())[-1]
+                self.active_agent_pid = next(reversed(self.agents))
             else:
                 self.active_agent_pid = None
+        self._update_single_agent_fast()
         
-        # Clean up view mappings
-        for source_id, mapped_pid in list(self.view_agent_map.items()):
-            if mapped_pid == pid:
-                del self.view_agent_map[source_id]
+        # Clean up view mappings; active_views is exactly this agent's views
+        view_agent_map = self.view_agent_map
+        for source_id in agent.active_views:
+            view_agent_map.pop(source_id, None)
         
         log.info(f"[-] Agent unregistered: PID {pid}")
         return True
     
+    def _update_single_agent_fast(self) -> None:
+        """Recompute the single-agent fast path after the registry changes."""
+        if len(self.agents) == 1:
+            self._single_agent_fast = next(iter(self.agents))
+        else:
+            self._single_agent_fast = None
+    
     # === TAINT MANAGEMENT ===
     
     def update_taint(self, source_id: str, level: int, url: str = "") -> None:
@@ -114,31 +135,38 @@ class Guardian:
             level: TaintLevel enum value (0-4)
             url: URL where taint was detected
         """
-        self.taint_records[source_id] = TaintRecord(
-            source_id=source_id,
-            level=level,
-            url=url
-        )
+        existing = self.taint_records.get(source_id)
+        if existing is not None and existing.level == level and existing.url == url:
+            # Same view re-flagging the same thing: just refresh the stamp
+            existing.timestamp = time.monotonic()
+        else:
+            self.taint_records[source_id] = TaintRecord(
+                source_id=source_id,
+                level=level,
+                url=url
+            )
         
         # Also update the associated agent's taint level
         agent_pid = self.get_agent_pid_for_view(source_id)
-        if agent_pid and agent_pid in self.agents:
+        agent = self.agents.get(agent_pid) if agent_pid else None
+        if agent is not None:
             # Agent's taint is the max of all their views
-            current_max = self.agents[agent_pid].taint_level
-            if level > current_max:
-                self.agents[agent_pid].taint_level = level
+            if level > agent.taint_level:
+                agent.taint_level = level
                 log.warning(f"Agent {agent_pid} taint escalated to {level}")
     
     def get_taint_level(self, pid: int) -> int:
         """Get current taint level for an agent PID."""
-        if pid in self.agents:
-            return self.agents[pid].taint_level
+        agent = self.agents.get(pid)
+        if agent is not None:
+            return agent.taint_level
         return 0  # CLEAN for unknown processes
     
     def clear_taint(self, pid: int) -> None:
         """Reset taint level for an agent (after cooldown/verification)."""
-        if pid in self.agents:
-            self.agents[pid].taint_level = 0
+        agent = self.agents.get(pid)
+        if agent is not None:
+            agent.taint_level = 0
             log.info(f"Taint cleared for agent {pid}")
     
     # === PID BRIDGE ===
@@ -155,28 +183,48 @@ class Guardian:
         - Use session IDs passed from agent to browser
         - Track which agent opened which URLs
         """
+        # Single agent: explicit mappings can only point at it, so skip
+        # the lookup and just record new views
+        fast = self._single_agent_fast
+        if fast is not None:
+            if source_id not in self.view_agent_map:
+                self.view_agent_map[source_id] = fast
+                self.agents[fast].active_views.add(source_id)
+            return fast
+        
         # Check explicit mapping first
-        if source_id in self.view_agent_map:
-            return self.view_agent_map[source_id]
+        pid = self.view_agent_map.get(source_id)
+        if pid is not None:
+            return pid
         
         # Fall back to active agent
-        if self.active_agent_pid:
-            # Auto-map this view to the active agent
-            self.view_agent_map[source_id] = self.active_agent_pid
-            if self.active_agent_pid in self.agents:
-                self.agents[self.active_agent_pid].active_views.add(source_id)
-            return self.active_agent_pid
+        active = self.active_agent_pid
+        if not active:
+            return None
         
-        return None
+        # Auto-map this view to the active agent
+        self.view_agent_map[source_id] = active
+        agent = self.agents.get(active)
+        if agent is not None:
+            agent.active_views.add(source_id)
+        return active
     
     def map_view_to_agent(self, source_id: str, pid: int) -> bool:
         """Explicitly map a browser view to an agent."""
-        if pid not in self.agents:
+        agent = self.agents.get(pid)
+        if agent is None:
             log.warning(f"Cannot map view to unknown agent {pid}")
             return False
         
+        # Keep active_views an exact reverse index of view_agent_map
+        previous = self.view_agent_map.get(source_id)
+        if previous is not None and previous != pid:
+            previous_agent = self.agents.get(previous)
+            if previous_agent is not None:
+                previous_agent.active_views.discard(source_id)
+        
         self.view_agent_map[source_id] = pid
-        self.agents[pid].active_views.add(source_id)
+        agent.active_views.add(source_id)
         log.debug(f"View {source_id} mapped to agent {pid}")
         return True
     
@@ -186,13 +234,30 @@ class Guardian:
         """Return current policy configuration."""
         return self.policy
     
+    @staticmethod
+    def _build_policy_rules(policy: dict) -> protocol_pb2.PolicyRules:
+        return protocol_pb2.PolicyRules(
+            max_allowed_taint=policy.get('max_taint', protocol_pb2.TaintLevel.MEDIUM),
+            allowed_ips=policy.get('allowed_ips', []),
+            allowed_paths=policy.get('allowed_paths', ['/tmp/*'])
+        )
+    
+    def get_policy_rules(self) -> protocol_pb2.PolicyRules:
+        """
+        Return the policy as a PolicyRules message.
+        
+        The same instance is returned on every call; callers must not
+        modify it.
+        """
+        return self._policy_rules
+    
     def should_block_exec(self, pid: int) -> bool:
         """
         Determine if a process should be blocked from executing commands.
         
         Returns True if taint level exceeds policy threshold.
         """
-        max_taint = self.policy.get('max_taint_for_exec', 2)  # Default: MEDIUM
+        max_taint = self._max_taint_for_exec
         current_taint = self.get_taint_level(pid)
         
         if current_taint > max_taint:
@@ -204,6 +269,8 @@ class Guardian:
     
     def get_state_summary(self) -> dict:
         """Get a summary of current guardian state for debugging."""
+        now = time.monotonic()
+        records = self.taint_records
         return {
             'agents': {
                 pid: {
@@ -214,12 +281,11 @@ class Guardian:
                 for pid, info in self.agents.items()
             },
             'active_agent': self.active_agent_pid,
+            # Columnar: index i of every list describes the same source
             'taint_records': {
-                sid: {
-                    'level': rec.level,
-                    'url': rec.url,
-                    'age_seconds': time.time() - rec.timestamp
-                }
-                for sid, rec in self.taint_records.items()
+                'source_ids': list(records),
+                'levels': [rec.level for rec in records.values()],
+                'urls': [rec.url for rec in records.values()],
+                'ages_seconds': [now - rec.timestamp for rec in records.values()]
             }
         }
@@ -7,47 +7,132 @@ Central gRPC server that:
 2. Manages the Agent Registry (PID Bridge)
 3. Pushes taint updates to the eBPF Core via Unix Socket
 
+Runs on grpc.aio: RPC handlers and the taint ring poller share one event
+loop, so Guardian state is only touched from that thread. Blocking Core
+IPC calls are handed to a pool of --grpc-workers threads.
+
 Usage:
-    python3 cortex/main.py [--port 50051] [--socket /var/run/telos.sock]
+    python3 cortex/main.py [--port 50051] [--socket /var/run/telos.sock] [--grpc-workers N]
 """
 
 import argparse
+import asyncio
 import logging
+import logging.handlers
+import queue
 import signal
 import sys
 import os
-import time
 from concurrent import futures
 from typing import Dict, Optional
 
 import grpc
 import yaml
 
+# libyaml's C parser when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _YAMLLoader
+except ImportError:
+    from yaml import SafeLoader as _YAMLLoader
+
 # Add parent directory for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from shared import protocol_pb2, protocol_pb2_grpc
 from cortex.guardian import Guardian
 from cortex.unix_socket import CoreIPCClient
+from shared.taint_ring import TaintRingReader
 
 # === CONFIGURATION ===
 
 DEFAULT_PORT = 50051
 DEFAULT_SOCKET = '/var/run/telos.sock'
-MAX_WORKERS = 10
+DEFAULT_GRPC_WORKERS = max(8, (os.cpu_count() or 1) * 2)
+MAX_CONCURRENT_RPCS = 256  # Beyond this, RPCs fail fast with RESOURCE_EXHAUSTED
+GRPC_SERVER_OPTIONS = [
+    ('grpc.so_reuseport', 1),
+    ('grpc.max_concurrent_streams', MAX_CONCURRENT_RPCS),
+]
+RING_POLL_INTERVAL = 0.001  # Seconds to sleep the first time the taint ring is empty
+RING_POLL_INTERVAL_MAX = 0.05  # Idle backoff doubles up to this
+
+LOG_FILE = '/tmp/telos_cortex.log'
+
+# === BANNER ===
+
+# ANSI color codes
+RESET = "\033[0m"
+BOLD = "\033[1m"
+GREEN = "\033[32m"
+CYAN = "\033[36m"
+PURPLE = "\033[38;5;135m"
+
+# Assembled once and written with a single write() each
+_BANNER = "\n".join([
+    "",
+    f"{PURPLE}   ██████╗ ██████╗ ██████╗ ████████╗███████╗██╗  ██╗{RESET}",
+    f"{PURPLE}  ██╔════╝██╔═══██╗██╔══██╗╚══██╔══╝██╔════╝╚██╗██╔╝{RESET}",
+    f"{PURPLE}  ██║     ██║   ██║██████╔╝   ██║   █████╗   ╚███╔╝ {RESET}",
+    f"{PURPLE}  ██║     ██║   ██║██╔══██╗   ██║   ██╔══╝   ██╔██╗ {RESET}",
+    f"{PURPLE}  ╚██████╗╚██████╔╝██║  ██║   ██║   ███████╗██╔╝ ██╗{RESET}",
+    f"{PURPLE}   ╚═════╝ ╚═════╝ ╚═╝  ╚═╝   ╚═╝   ╚══════╝╚═╝  ╚═╝{RESET}",
+    "",
+    f"{CYAN}            ╔═══════════════════════════════╗{RESET}",
+    f"{CYAN}            ║{BOLD}       AI SECURITY BRAIN       {RESET}{CYAN}║{RESET}",
+    f"{CYAN}            ╚═══════════════════════════════╝{RESET}",
+    "",
+    "",
+])
+
+_ONLINE = "\n".join([
+    "",
+    f"{GREEN}  ╔═══════════════════════════════════════════════════════╗{RESET}",
+    f"{GREEN}  ║{BOLD}               CORTEX ONLINE - Awaiting Input          {RESET}{GREEN}║{RESET}",
+    f"{GREEN}  ╚═══════════════════════════════════════════════════════╝{RESET}",
+    "",
+    "",
+])
 
 # === LOGGING ===
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] %(name)s: %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('/tmp/telos_cortex.log')
-    ]
-)
+# Log calls only enqueue; a QueueListener thread does the console and file
+# I/O so the event loop never blocks on write(2) or the handler locks.
+# Both are installed by main(), so importing this module leaves logging alone.
 log = logging.getLogger('telos.cortex')
 
+_log_handler: Optional[logging.handlers.QueueHandler] = None
+_log_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def start_log_listener() -> None:
+    """Route root logging through a queue and start the thread that writes it."""
+    global _log_handler, _log_listener
+    if _log_listener is not None:
+        return
+    log_queue = queue.SimpleQueue()
+    formatter = logging.Formatter('%(asctime)s [%(levelname)s] %(name)s: %(message)s')
+    handlers = [logging.StreamHandler(), logging.FileHandler(LOG_FILE)]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    _log_listener = logging.handlers.QueueListener(log_queue, *handlers)
+    _log_listener.start()
+    _log_handler = logging.handlers.QueueHandler(log_queue)
+    root = logging.getLogger()
+    root.addHandler(_log_handler)
+    root.setLevel(logging.INFO)
+
+
+def stop_log_listener() -> None:
+    """Drain queued records and close the log handlers."""
+    global _log_handler, _log_listener
+    if _log_listener is None:
+        return
+    logging.getLogger().removeHandler(_log_handler)
+    _log_listener.stop()
+    for handler in _log_listener.handlers:
+        handler.close()
+    _log_handler = _log_listener = None
+
 # === GRPC SERVICE IMPLEMENTATION ===
 
 class TelosControlService(protocol_pb2_grpc.TelosControlServicer):
@@ -58,38 +143,52 @@ class TelosControlService(protocol_pb2_grpc.TelosControlServicer):
     def __init__(self, guardian: Guardian, ipc_client: CoreIPCClient):
         self.guardian = guardian
         self.ipc = ipc_client
+        # Constant after startup; resolved once instead of per report
+        self._level_names = {v: k for k, v in protocol_pb2.TaintLevel.items()}
+        self._high_level = protocol_pb2.TaintLevel.HIGH
         log.info("TelosControlService initialized")
     
-    def ReportTaint(self, request: protocol_pb2.TaintReport, 
-                    context: grpc.ServicerContext) -> protocol_pb2.Ack:
+    async def ReportTaint(self, request: protocol_pb2.TaintReport,
+                          context: grpc.aio.ServicerContext) -> protocol_pb2.Ack:
+        """Handle taint reports from Browser Eye."""
+        return await self.handle_taint(request.source_id, request.level,
+                                       request.url, request.payload_preview)
+    
+    async def handle_taint(self, source_id: str, level: int, url: str,
+                           payload_preview: str) -> protocol_pb2.Ack:
         """
-        Handle taint reports from Browser Eye.
+        Process one taint report, from gRPC or the shared-memory taint ring.
         
         Flow:
         1. Update internal state in Guardian
         2. Resolve which Agent PID is affected (PID Bridge)
         3. Push taint level to eBPF Core via Unix Socket
+        
+        Step 3 runs in a worker thread: queueing the update is quick, but
+        a disconnected IPC client reconnects inline, which can block for
+        up to its CONNECT_TIMEOUT and would stall every in-flight RPC.
         """
-        level_name = protocol_pb2.TaintLevel.Name(request.level)
-        log.info(f"[!] Taint Detected: {level_name} at {request.url}")
-        log.debug(f"    Source: {request.source_id}, Preview: {request.payload_preview[:32]}...")
+        level_name = self._level_names.get(level, str(level))
+        log.info("[!] Taint Detected: %s at %s", level_name, url)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("    Source: %s, Preview: %s...", source_id, payload_preview[:32])
         
         try:
             # 1. Update Guardian state
-            self.guardian.update_taint(request.source_id, request.level, request.url)
+            self.guardian.update_taint(source_id, level, url)
             
             # 2. Resolve Agent PID (PID Bridge logic)
-            agent_pid = self.guardian.get_agent_pid_for_view(request.source_id)
+            agent_pid = self.guardian.get_agent_pid_for_view(source_id)
             
             if agent_pid is None:
-                log.warning(f"No agent registered for source {request.source_id}")
+                log.warning("No agent registered for source %s", source_id)
                 # Still acknowledge - taint is recorded
                 return protocol_pb2.Ack(success=True, message="Taint recorded, no agent mapped")
             
             # 3. Push to Core if HIGH or above
-            if request.level >= protocol_pb2.TaintLevel.HIGH:
-                log.warning(f"[⚠] HIGH+ taint - pushing to Core for PID {agent_pid}")
-                success = self.ipc.send_update_taint(agent_pid, request.level)
+            if level >= self._high_level:
+                log.warning("[⚠] HIGH+ taint - pushing to Core for PID %s", agent_pid)
+                success = await asyncio.to_thread(self.ipc.send_update_taint, agent_pid, level)
                 
                 if not success:
                     log.error("Failed to push taint to Core")
@@ -101,23 +200,24 @@ class TelosControlService(protocol_pb2_grpc.TelosControlServicer):
                 )
             else:
                 # LOW/MEDIUM - record but don't block
-                log.info(f"[~] {level_name} taint recorded, no enforcement action")
+                log.info("[~] %s taint recorded, no enforcement action", level_name)
                 return protocol_pb2.Ack(success=True, message="Taint recorded")
                 
         except Exception as e:
-            log.error(f"ReportTaint error: {e}")
+            log.error("ReportTaint error: %s", e)
             return protocol_pb2.Ack(success=False, message=str(e))
     
-    def DeclareIntent(self, request: protocol_pb2.IntentRequest,
-                      context: grpc.ServicerContext) -> protocol_pb2.IntentVerdict:
+    async def DeclareIntent(self, request: protocol_pb2.IntentRequest,
+                            context: grpc.aio.ServicerContext) -> protocol_pb2.IntentVerdict:
         """
         Handle intent declarations from Agents.
         
         For Phase 2, this is a stub. Full implementation in Phase 3.
         Currently: Allow all intents, log for audit.
         """
-        log.info(f"[Intent] Agent {request.agent_pid}: {request.natural_language_goal}")
-        log.debug(f"    Planned actions: {request.planned_actions}")
+        log.info("[Intent] Agent %s: %s", request.agent_pid, request.natural_language_goal)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("    Planned actions: %s", list(request.planned_actions))
         
         # Phase 2: Stub - allow all
         # Phase 3: Will integrate with Guardian for actual verification
@@ -131,25 +231,16 @@ class TelosControlService(protocol_pb2_grpc.TelosControlServicer):
             policy_ttl_ms=60000  # 1 minute
         )
     
-    def GetPolicy(self, request: protocol_pb2.PolicyQuery,
-                  context: grpc.ServicerContext) -> protocol_pb2.PolicyRules:
+    async def GetPolicy(self, request: protocol_pb2.PolicyQuery,
+                        context: grpc.aio.ServicerContext) -> protocol_pb2.PolicyRules:
         """
         Return current policy rules for a given PID.
         Used by daemons to sync state.
         """
-        log.debug(f"[Policy] Query from PID {request.pid}")
-        
-        # Get current taint level for this process
-        taint_level = self.guardian.get_taint_level(request.pid)
+        log.debug("[Policy] Query from PID %s", request.pid)
         
-        # Get allowed destinations from policy
-        policy = self.guardian.get_policy()
-        
-        return protocol_pb2.PolicyRules(
-            max_allowed_taint=policy.get('max_taint', protocol_pb2.TaintLevel.MEDIUM),
-            allowed_ips=policy.get('allowed_ips', []),
-            allowed_paths=policy.get('allowed_paths', ['/tmp/*'])
-        )
+        # Same rules for every PID, prebuilt by Guardian
+        return self.guardian.get_policy_rules()
 
 
 # === SERVER LIFECYCLE ===
@@ -159,38 +250,43 @@ class CortexServer:
     Manages the gRPC server lifecycle and IPC connections.
     """
     
-    def __init__(self, port: int, socket_path: str, policy_path: str):
+    def __init__(self, port: int, socket_path: str, policy_path: str,
+                 grpc_workers: int = DEFAULT_GRPC_WORKERS):
         self.port = port
         self.socket_path = socket_path
         self.policy_path = policy_path
+        self.grpc_workers = grpc_workers
         self.server = None
         self.guardian = None
         self.ipc = None
-        self._shutdown = False
+        self.ring = None
+        self._ring_task = None
+        # Set from the loop's signal handler; asyncio.Event binds to the
+        # running loop on first wait (Python 3.10+)
+        self._shutdown = asyncio.Event()
         
     def start(self):
-        """Start the Cortex server."""
-        # ANSI color codes
-        RESET = "\033[0m"
-        BOLD = "\033[1m"
-        GREEN = "\033[32m"
-        CYAN = "\033[36m"
-        MAGENTA = "\033[35m"
-        PURPLE = "\033[38;5;135m"
+        """Start the Cortex server and run its event loop until shutdown."""
+        asyncio.run(self._serve())
+    
+    async def _serve(self):
+        """Bring up Guardian, IPC and the gRPC server, then wait for shutdown."""
+        # Before anything that needs cleanup: a signal during startup
+        # (the Core connect alone can take CONNECT_TIMEOUT) still ends
+        # in stop()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, self.signal_handler, signum, None)
+        
+        # asyncio.to_thread() runs the blocking Core IPC calls here; grpc.aio
+        # also gets it for any handler it has to run synchronously
+        executor = futures.ThreadPoolExecutor(
+            max_workers=self.grpc_workers, thread_name_prefix='cortex-worker'
+        )
+        loop.set_default_executor(executor)
         
-        # Print colorful banner
-        print()
-        print(f"{PURPLE}   ██████╗ ██████╗ ██████╗ ████████╗███████╗██╗  ██╗{RESET}")
-        print(f"{PURPLE}  ██╔════╝██╔═══██╗██╔══██╗╚══██╔══╝██╔════╝╚██╗██╔╝{RESET}")
-        print(f"{PURPLE}  ██║     ██║   ██║██████╔╝   ██║   █████╗   ╚███╔╝ {RESET}")
-        print(f"{PURPLE}  ██║     ██║   ██║██╔══██╗   ██║   ██╔══╝   ██╔██╗ {RESET}")
-        print(f"{PURPLE}  ╚██████╗╚██████╔╝██║  ██║   ██║   ███████╗██╔╝ ██╗{RESET}")
-        print(f"{PURPLE}   ╚═════╝ ╚═════╝ ╚═╝  ╚═╝   ╚═╝   ╚══════╝╚═╝  ╚═╝{RESET}")
-        print()
-        print(f"{CYAN}            ╔═══════════════════════════════╗{RESET}")
-        print(f"{CYAN}            ║{BOLD}       AI SECURITY BRAIN       {RESET}{CYAN}║{RESET}")
-        print(f"{CYAN}            ╚═══════════════════════════════╝{RESET}")
-        print()
+        sys.stdout.write(_BANNER)
+        sys.stdout.flush()
         
         log.info("Initializing...")
         
@@ -202,79 +298,122 @@ class CortexServer:
         log.info("✓ Guardian initialized")
         
         # Initialize IPC to Core
-        self.ipc = CoreIPCClient(self.socket_path)
-        connected = self.ipc.connect()
+        self.ipc = await asyncio.to_thread(CoreIPCClient.shared, self.socket_path)
+        connected = self.ipc.connected
         if connected:
-            log.info(f"✓ Connected to Core at {self.socket_path}")
+            log.info("✓ Connected to Core at %s", self.socket_path)
         else:
-            log.warning(f"⚠ Core not available at {self.socket_path} - running standalone")
+            log.warning("⚠ Core not available at %s - running standalone", self.socket_path)
         
         # Create gRPC server
-        self.server = grpc.server(futures.ThreadPoolExecutor(max_workers=MAX_WORKERS))
+        self.server = grpc.aio.server(
+            migration_thread_pool=executor,
+            options=GRPC_SERVER_OPTIONS,
+            maximum_concurrent_rpcs=MAX_CONCURRENT_RPCS
+        )
         
         # Register service
         service = TelosControlService(self.guardian, self.ipc)
         protocol_pb2_grpc.add_TelosControlServicer_to_server(service, self.server)
         
+        # Open the shared-memory taint ring for the Native Host
+        try:
+            self.ring = TaintRingReader()
+            self._ring_task = asyncio.create_task(self._poll_taint_ring(service))
+            log.info("✓ Taint ring open")
+        except OSError as e:
+            log.warning("⚠ Taint ring unavailable (%s) - gRPC only", e)
+        
         # Bind to port
         address = f'[::]:{self.port}'
         self.server.add_insecure_port(address)
         
         # Start
-        self.server.start()
-        log.info(f"✓ gRPC server listening on port {self.port}")
+        await self.server.start()
+        log.info("✓ gRPC server listening on port %d", self.port)
         
-        print()
-        print(f"{GREEN}  ╔═══════════════════════════════════════════════════════╗{RESET}")
-        print(f"{GREEN}  ║{BOLD}               CORTEX ONLINE - Awaiting Input          {RESET}{GREEN}║{RESET}")
-        print(f"{GREEN}  ╚═══════════════════════════════════════════════════════╝{RESET}")
-        print()
+        sys.stdout.write(_ONLINE)
+        sys.stdout.flush()
         
         # Wait for shutdown
-        self._wait_for_termination()
+        await self._wait_for_termination()
         
     def _load_policy(self) -> dict:
         """Load policy configuration from YAML."""
         try:
             with open(self.policy_path, 'r') as f:
-                policy = yaml.safe_load(f) or {}
-                log.info(f"✓ Loaded policy from {self.policy_path}")
+                policy = yaml.load(f, Loader=_YAMLLoader) or {}
+                log.info("✓ Loaded policy from %s", self.policy_path)
                 return policy
         except FileNotFoundError:
-            log.warning(f"⚠ Policy file not found: {self.policy_path}, using defaults")
+            log.warning("⚠ Policy file not found: %s, using defaults", self.policy_path)
             return {}
         except Exception as e:
-            log.error(f"Failed to load policy: {e}")
+            log.error("Failed to load policy: %s", e)
             return {}
     
-    def _wait_for_termination(self):
-        """Block until shutdown signal received."""
+    async def _poll_taint_ring(self, service: TelosControlService):
+        """
+        Drain taint reports written to the shared-memory ring.
+        
+        The poll interval doubles while the ring stays empty, so an idle
+        daemon wakes at most 1/RING_POLL_INTERVAL_MAX times a second, and
+        drops back to RING_POLL_INTERVAL as soon as a record shows up.
+        """
+        interval = RING_POLL_INTERVAL
+        while not self._shutdown.is_set():
+            records = self.ring.drain()
+            if not records:
+                await asyncio.sleep(interval)
+                interval = min(interval * 2, RING_POLL_INTERVAL_MAX)
+                continue
+            interval = RING_POLL_INTERVAL
+            for source_id, url, level, preview in records:
+                try:
+                    await service.handle_taint(source_id, level, url, preview)
+                except Exception as e:
+                    log.error("Taint ring record error: %s", e)
+            # A full drain can be long; let RPCs in between batches
+            await asyncio.sleep(0)
+    
+    async def _wait_for_termination(self):
+        """Wait until shutdown signal received."""
         try:
-            while not self._shutdown:
-                time.sleep(1)
-        except KeyboardInterrupt:
-            pass
+            await self._shutdown.wait()
         finally:
-            self.stop()
+            await self.stop()
     
-    def stop(self):
+    async def stop(self):
         """Gracefully stop the server."""
         log.info("Shutting down Cortex...")
         
         if self.server:
-            self.server.stop(grace=5)
+            await self.server.stop(grace=5)
             log.info("✓ gRPC server stopped")
         
+        if self.ring:
+            self._shutdown.set()
+            if self._ring_task:
+                await self._ring_task
+            self.ring.close()
+            log.info("✓ Taint ring closed")
+        
         if self.ipc:
-            self.ipc.close()
+            # Both can wait up to READ_TIMEOUT on the Core; keep the loop free
+            await asyncio.to_thread(self.ipc.flush)
+            metrics = self.ipc.get_metrics()
+            if metrics:
+                log.info("IPC timings: %s", metrics)
+            await asyncio.to_thread(self.ipc.close)
             log.info("✓ IPC connection closed")
         
         log.info("TELOS CORTEX offline")
+        stop_log_listener()
     
     def signal_handler(self, signum, frame):
         """Handle termination signals."""
-        log.info(f"Received signal {signum}")
-        self._shutdown = True
+        log.info("Received signal %s", signum)
+        self._shutdown.set()
 
 
 # === MAIN ===
@@ -288,21 +427,19 @@ def main():
     parser.add_argument('--policy', type=str, 
                         default=os.path.join(os.path.dirname(__file__), 'policy.yaml'),
                         help='Path to policy YAML file')
+    parser.add_argument('--grpc-workers', type=int, default=DEFAULT_GRPC_WORKERS,
+                        help=f'Threads for blocking Core IPC calls and synchronous gRPC handlers (default: {DEFAULT_GRPC_WORKERS})')
     parser.add_argument('--debug', action='store_true',
                         help='Enable debug logging')
     
     args = parser.parse_args()
     
+    start_log_listener()
     if args.debug:
         logging.getLogger().setLevel(logging.DEBUG)
     
-    # Create and run server
-    server = CortexServer(args.port, args.socket, args.policy)
-    
-    # Register signal handlers
-    signal.signal(signal.SIGINT, server.signal_handler)
-    signal.signal(signal.SIGTERM, server.signal_handler)
-    
+    # Create and run server (signal handlers are installed on its event loop)
+    server = CortexServer(args.port, args.socket, args.policy, args.grpc_workers)
     server.start()
 
 
@@ -23,6 +23,14 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import grpc
 from shared import protocol_pb2, protocol_pb2_grpc
 
+CORTEX_ADDRESS = 'localhost:50051'
+CHANNEL_OPTIONS = [('grpc.keepalive_time_ms', 30000)]
+
+def open_channel() -> grpc.Channel:
+    """One gzip-compressed channel shared by every RPC in the run."""
+    return grpc.insecure_channel(CORTEX_ADDRESS, options=CHANNEL_OPTIONS,
+                                 compression=grpc.Compression.Gzip)
+
 def print_banner(text):
     print()
     print("╔" + "═" * (len(text) + 2) + "╗")
@@ -41,13 +49,18 @@ def main():
     # Connect to Cortex
     print("[1/5] Connecting to Cortex...")
     try:
-        channel = grpc.insecure_channel('localhost:50051')
-        stub = protocol_pb2_grpc.TelosControlStub(channel)
-        print("      ✓ Connected to Cortex on port 50051")
+        channel = open_channel()
     except Exception as e:
         print(f"      ✗ Failed to connect: {e}")
         return 1
     
+    with channel:
+        stub = protocol_pb2_grpc.TelosControlStub(channel)
+        print("      ✓ Connected to Cortex on port 50051")
+        return run_steps(stub, my_pid)
+
+def run_steps(stub: protocol_pb2_grpc.TelosControlStub, my_pid: int) -> int:
+    """Steps 2-5, all over the caller's channel."""
     # Step 1: Register as an agent
     print()
     print("[2/5] Registering as Agent (DeclareIntent)...")
@@ -11,11 +11,16 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import grpc
 from shared import protocol_pb2, protocol_pb2_grpc
 
+CORTEX_ADDRESS = 'localhost:50051'
+CHANNEL_OPTIONS = [('grpc.keepalive_time_ms', 30000)]
+
 def main():
     # Connect to Cortex
-    channel = grpc.insecure_channel('localhost:50051')
-    stub = protocol_pb2_grpc.TelosControlStub(channel)
-    
+    with grpc.insecure_channel(CORTEX_ADDRESS, options=CHANNEL_OPTIONS,
+                               compression=grpc.Compression.Gzip) as channel:
+        return inject_taint(protocol_pb2_grpc.TelosControlStub(channel))
+
+def inject_taint(stub: protocol_pb2_grpc.TelosControlStub) -> int:
     print("╔═══════════════════════════════════════════════════════╗")
     print("║          TELOS Test - Simulating Taint Injection      ║")
     print("╚═══════════════════════════════════════════════════════╝")
@@ -4,22 +4,157 @@ Telos Cortex - Unix Socket IPC Client
 Communicates with the Telos Core (Go eBPF Loader) via Unix Domain Socket.
 
 Protocol:
-    - JSON messages terminated by newline
-    - Commands: UPDATE_TAINT, CLEAR_TAINT, GET_STATE
+    - Frames: 4-byte big-endian length prefix + JSON body, both directions
+    - Commands: UPDATE_TAINT, CLEAR_TAINT, GET_STATE, BATCH, BULK_FD
     - Responses: {success: bool, error?: string, data?: object}
+    - BATCH carries {ops: [{command, data}, ...]} and answers with
+      {data: {results: [response, ...]}}, one per op, in order
+    - A request "id" is echoed in the response; both clients use it to
+      match replies to requests that are in flight together
+    - BULK_FD carries {count: N} plus one memfd passed with SCM_RIGHTS;
+      the memfd holds N packed records (pid u32 BE, taint_level u8)
+
+Syscalls per command: queued taint updates are coalesced into one BATCH,
+so a burst costs one sendmsg() plus the recv_into() calls for a single
+reply. That leaves nothing for an io_uring submission queue to batch.
 """
 
+import asyncio
+import fcntl
+import itertools
 import json
+import mmap
+import os
+import queue
+import select
 import socket
+import struct
 import logging
-from typing import Optional, Dict, Any
+import threading
+import time
+from array import array
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Optional, Dict, Any, Iterable, List, Sequence, Tuple
 
 log = logging.getLogger('telos.ipc')
 
+# orjson encodes straight to bytes, parses straight from the receive buffer
+# and is several times faster on these small command dicts; fall back to the
+# stdlib codec when it is not installed.
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    def _json_loads(buf) -> Any:
+        # json.loads() takes bytes but not a memoryview
+        return json.loads(bytes(buf))
+
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+# Every Core reply has the same shape, so decode it into a typed record
+# instead of a dict. msgspec builds it straight from the JSON with a
+# decoder compiled once for this schema; without msgspec the dict from
+# _json_loads is copied into an equivalent slotted dataclass. BATCH
+# results inside data stay plain dicts.
+try:
+    import msgspec
+
+    class CoreResponse(msgspec.Struct):
+        success: bool = False
+        error: Optional[str] = None
+        data: Optional[Dict[str, Any]] = None
+        id: Optional[int] = None
+
+    _decode_response = msgspec.json.Decoder(CoreResponse).decode
+    _DECODE_ERRORS = (ValueError, msgspec.DecodeError)
+except ImportError:
+    from dataclasses import dataclass
+
+    @dataclass(slots=True)
+    class CoreResponse:
+        success: bool = False
+        error: Optional[str] = None
+        data: Optional[Dict[str, Any]] = None
+        id: Optional[int] = None
+
+    def _decode_response(buf) -> CoreResponse:
+        obj = _json_loads(buf)
+        if not isinstance(obj, dict):
+            raise ValueError(f"expected a JSON object, got {type(obj).__name__}")
+        return CoreResponse(obj.get('success', False), obj.get('error'),
+                            obj.get('data'), obj.get('id'))
+
+    # JSON decode errors from json and orjson are ValueErrors
+    _DECODE_ERRORS = (ValueError,)
+
 DEFAULT_SOCKET_PATH = '/var/run/telos.sock'
-BUFFER_SIZE = 4096
+CORE_FD_ENV = 'TELOS_CORE_FD'  # Connected Core socket inherited from a supervisor
+BUFFER_SIZE = 64 * 1024  # Initial receive buffer; grows for larger frames
+MAX_FRAME_SIZE = 16 << 20  # Must match maxFrameSize in the Core
+SOCKET_BUFFER_SIZE = 4 << 20  # 4MB; small defaults stall bursts of updates
 CONNECT_TIMEOUT = 5.0
 READ_TIMEOUT = 10.0
+RECONNECT_BACKOFF_MIN = 0.05  # Seconds before the first retry after a failed connect
+RECONNECT_BACKOFF_MAX = 5.0
+# Read once at import so the hot path only tests a module constant
+METRICS_ENABLED = os.environ.get('TELOS_IPC_METRICS', '') not in ('', '0')
+
+_FRAME_HEADER = struct.Struct('>I')
+
+# Prebuilt UPDATE_TAINT body; only the two ints vary, so the hot path
+# skips building dicts and running the JSON encoder. %d keeps it valid JSON.
+_UPDATE_TAINT_BODY = b'{"command":"UPDATE_TAINT","data":{"pid":%d,"taint_level":%d}}'
+_BATCH_PREFIX = b'{"command":"BATCH","data":{"ops":['
+_BATCH_SUFFIX = b']}}'
+
+# One success line per command; a BATCH logs once, not once per PID
+_LOG_TAINT_OK = "Core: Taint updated for PID %s -> level %s"
+_LOG_BATCH_OK = "Core: Taint updated for %s/%s PIDs"
+
+# EPIPE comes back as BrokenPipeError instead of raising SIGPIPE, whatever
+# signal disposition an embedding process has installed
+_SEND_FLAGS = getattr(socket, 'MSG_NOSIGNAL', 0)
+_BULK_RECORD = struct.Struct('>IB')  # pid, taint_level; must match bulkRecordSize in the Core
+_BULK_SEALS = fcntl.F_SEAL_SHRINK | fcntl.F_SEAL_GROW | fcntl.F_SEAL_WRITE | fcntl.F_SEAL_SEAL
+BATCH_MAX_UPDATES = 64  # Taint updates drained into one BATCH command
+BATCH_WINDOW = 0.002    # Seconds to wait for more updates before sending
+
+
+def _fail_unmatched(pending: Dict[int, Any], response: Optional[CoreResponse],
+                    error: str) -> None:
+    """
+    Resolve waiters for a reply that can't be matched by id.
+    
+    pending maps request ids to concurrent or asyncio futures. With one
+    request outstanding the reply must be its answer; with several there
+    is no telling whose it is, so all of them fail rather than wait out
+    READ_TIMEOUT.
+    """
+    # Snapshot: senders may add entries while this runs
+    outstanding = list(pending)
+    if len(outstanding) == 1 and response is not None:
+        future = pending.pop(outstanding[0], None)
+        if future is not None and not future.done():
+            future.set_result(response)
+        return
+    if len(outstanding) > 1:
+        log.error("Core: %s; failing %s pending commands", error, len(outstanding))
+    for req_id in outstanding:
+        future = pending.pop(req_id, None)
+        if future is not None and not future.done():
+            future.set_result(CoreResponse(success=False, error=f"Protocol error: {error}"))
+
+
+class _QueuedCommand:
+    """A command waiting for the batch worker, and the Future for its reply."""
+    __slots__ = ('command', 'body', 'future')
+    
+    def __init__(self, command: str, body: bytes):
+        self.command = command
+        self.body = body
+        self.future: Future = Future()
 
 
 class CoreIPCClient:
@@ -28,53 +163,178 @@ class CoreIPCClient:
     
     The Core listens on a Unix socket and accepts JSON commands
     to update BPF maps.
+    
+    Commands from any thread go through one background worker, so
+    concurrent callers share a connection and their commands batch
+    together. Use shared() to get the process-wide client for a socket.
+    Replies are read by a per-connection reader thread and matched to
+    requests by id, so direct sends don't wait for each other's replies.
     """
     
+    _shared: Dict[str, 'CoreIPCClient'] = {}
+    _shared_lock = threading.Lock()
+    
     def __init__(self, socket_path: str = DEFAULT_SOCKET_PATH):
         self.socket_path = socket_path
         self.sock: Optional[socket.socket] = None
         self.connected = False
+        # The socket stays non-blocking once connected; senders wait for
+        # POLLOUT through this, the reader thread has its own poller
+        self._poller: Optional[select.poll] = None
+        # Serializes writes and connection changes, not round trips
+        self._send_lock = threading.Lock()
+        # Requests awaiting a reply on the current connection, by id
+        self._pending: Dict[int, Future] = {}
+        self._ids = itertools.count(1)
+        # command -> [count, send_ns, total_ns], only kept with METRICS_ENABLED
+        self._timings: Dict[str, List[int]] = {}
+        self._metrics_lock = threading.Lock()
+        # Taint updates waiting for the batch worker
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+        # _closing stops new work being queued; _closed is set once close()
+        # has finished, after which nothing may be sent
+        self._closing = False
+        self._closed = False
+        # Reconnect backoff: commands fail fast until _next_retry_at
+        self._backoff = RECONNECT_BACKOFF_MIN
+        self._next_retry_at = 0.0
+    
+    @classmethod
+    def shared(cls, socket_path: str = DEFAULT_SOCKET_PATH) -> 'CoreIPCClient':
+        """
+        The process-wide client for socket_path, connected on first use.
+        
+        Agent threads should use this rather than a client each, so they
+        pay for one connect() and their commands share batches.
+        """
+        with cls._shared_lock:
+            client = cls._shared.get(socket_path)
+            if client is None:
+                client = cls._shared[socket_path] = cls(socket_path)
+                client.connect()
+            return client
     
     def connect(self) -> bool:
         """
         Establish connection to the Core daemon.
         
+        Uses the connected socket named by TELOS_CORE_FD if a supervisor
+        set it, otherwise connects to socket_path.
+        
         Returns True if connected, False otherwise.
         The client can operate without connection (standalone mode).
+        Reopens a client that was closed.
         """
+        # Same lock _stop_worker() sets _closing under; only an explicit
+        # connect() may reopen the client, never an internal reconnect
+        with self._worker_lock:
+            self._closing = self._closed = False
+        with self._send_lock:
+            return self.connected or self._open_connection()
+    
+    def _open_connection(self) -> bool:
+        """Connect and attach a new socket; caller holds self._send_lock."""
+        # An fd handed down by the supervisor is used once; reconnects
+        # after it drops go through the socket path
+        inherited = os.environ.pop(CORE_FD_ENV, None)
+        if inherited is not None:
+            try:
+                self._attach(socket.socket(fileno=int(inherited)))
+                log.info("Connected to Core via inherited fd %s", inherited)
+                return True
+            except (ValueError, OSError) as e:
+                log.warning("Ignoring %s=%r: %s", CORE_FD_ENV, inherited, e)
+                self._handle_disconnect()
+        
         try:
             self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
             self.sock.settimeout(CONNECT_TIMEOUT)
             self.sock.connect(self.socket_path)
-            self.connected = True
-            log.info(f"Connected to Core at {self.socket_path}")
+            self._attach(self.sock)
+            log.info("Connected to Core at %s", self.socket_path)
             return True
             
         except FileNotFoundError:
-            log.warning(f"Core socket not found: {self.socket_path}")
-            self.connected = False
-            return False
+            log.warning("Core socket not found: %s", self.socket_path)
         except ConnectionRefusedError:
-            log.warning(f"Core connection refused: {self.socket_path}")
-            self.connected = False
-            return False
+            log.warning("Core connection refused: %s", self.socket_path)
         except Exception as e:
-            log.error(f"Core connection failed: {e}")
-            self.connected = False
+            log.error("Core connection failed: %s", e)
+        
+        self._handle_disconnect()
+        self._next_retry_at = time.monotonic() + self._backoff
+        self._backoff = min(self._backoff * 2, RECONNECT_BACKOFF_MAX)
+        return False
+    
+    @classmethod
+    def from_fd(cls, fd: int, socket_path: str = DEFAULT_SOCKET_PATH) -> 'CoreIPCClient':
+        """
+        Wrap an already-connected socket to Core, e.g. one end of a
+        socketpair() inherited from a supervisor, skipping connect().
+        
+        The client owns fd from here on. socket_path is only used to
+        reconnect if the connection drops.
+        """
+        client = cls(socket_path)
+        client._attach(socket.socket(fileno=fd))
+        return client
+    
+    def _attach(self, sock: socket.socket) -> None:
+        """Configure a connected socket and make it the client's connection."""
+        self.sock = sock
+        # Kernel clamps these to net.core.{w,r}mem_max
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_SIZE)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_SIZE)
+        # Set once here rather than settimeout() per command, which
+        # costs two fcntl() calls each time
+        sock.setblocking(False)
+        self._poller = select.poll()
+        self._poller.register(sock.fileno(), select.POLLOUT)
+        self._pending = {}
+        self.connected = True
+        self._backoff = RECONNECT_BACKOFF_MIN
+        self._next_retry_at = 0.0
+        threading.Thread(
+            target=self._read_loop, args=(sock, self._pending),
+            name='cortex-ipc-reader', daemon=True
+        ).start()
+    
+    def _reconnect(self) -> bool:
+        """
+        Connect again, unless already connected, closing, or still inside
+        the backoff window; caller holds self._send_lock.
+        
+        While Core is down this returns False without any syscalls, so a
+        burst of commands does not turn into a burst of connect attempts.
+        """
+        if self.connected:
+            return True
+        if self._closing or time.monotonic() < self._next_retry_at:
             return False
+        return self._open_connection()
+    
+    def _ensure_connected(self) -> bool:
+        """Reconnect if needed, so that concurrent callers open one socket."""
+        if self.connected:
+            return True
+        with self._send_lock:
+            return self._reconnect()
     
     def close(self) -> None:
-        """Close the socket connection."""
-        if self.sock:
-            try:
-                self.sock.close()
-            except Exception:
-                pass
-            self.sock = None
-            self.connected = False
-            log.debug("IPC connection closed")
+        """Send any queued updates, then close the socket connection."""
+        with CoreIPCClient._shared_lock:
+            if CoreIPCClient._shared.get(self.socket_path) is self:
+                del CoreIPCClient._shared[self.socket_path]
+        self._stop_worker()
+        with self._send_lock:
+            self._closed = True
+            if self.sock:
+                self._handle_disconnect()
+                log.debug("IPC connection closed")
     
-    def _send_command(self, command: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    def _send_command(self, command: str, data: Dict[str, Any]) -> Optional[CoreResponse]:
         """
         Send a command to Core and wait for response.
         
@@ -83,96 +343,484 @@ class CoreIPCClient:
             data: Command payload
             
         Returns:
-            Response dict or None on failure
+            CoreResponse or None on failure
+        """
+        return self._send_body(command, _json_dumps({'command': command, 'data': data}))
+    
+    def _send_body(self, command: str, body: bytes, fds: Sequence[int] = ()) -> Optional[CoreResponse]:
+        """
+        Send an already-encoded command body and wait for the response.
+        
+        Only the write holds self._send_lock; the reply arrives through
+        the reader thread, so other threads can send while this one waits.
+        command only labels the timing counters.
         """
-        if not self.connected:
-            # Try to reconnect
-            if not self.connect():
+        future: Future = Future()
+        if METRICS_ENABLED:
+            started = time.perf_counter_ns()
+        with self._send_lock:
+            if not self._reconnect():
+                return None
+            
+            req_id = next(self._ids)
+            pending = self._pending
+            pending[req_id] = future
+            try:
+                # Send as length-prefixed JSON
+                self._send_frame(body, fds, req_id)
+                if METRICS_ENABLED:
+                    sent = time.perf_counter_ns()
+            except Exception as e:
+                pending.pop(req_id, None)
+                if isinstance(e, socket.timeout):
+                    log.error("Core send timeout")
+                elif isinstance(e, BrokenPipeError):
+                    log.error("Core disconnected (broken pipe)")
+                else:
+                    log.error("IPC error: %s", e)
+                self._handle_disconnect()
                 return None
         
         try:
-            # Build message
-            message = {
-                'command': command,
-                'data': data
+            response = future.result(READ_TIMEOUT)
+        except FutureTimeoutError:
+            # A late reply finds no pending entry and is dropped
+            pending.pop(req_id, None)
+            log.error("Core response timeout")
+            return None
+        
+        if METRICS_ENABLED:
+            self._record_timing(command, sent - started, time.perf_counter_ns() - started)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Core: %s -> %s", body.decode('utf-8', 'replace'), response)
+        return response
+    
+    def _record_timing(self, command: str, send_ns: int, total_ns: int) -> None:
+        with self._metrics_lock:
+            timing = self._timings.get(command)
+            if timing is None:
+                timing = self._timings[command] = [0, 0, 0]
+            timing[0] += 1
+            timing[1] += send_ns
+            timing[2] += total_ns
+    
+    def get_metrics(self) -> Dict[str, Dict[str, int]]:
+        """
+        Per-command timing counters; empty unless TELOS_IPC_METRICS is set.
+        
+        send_ns covers taking the send lock and writing the frame;
+        total_ns runs until the reply is parsed, so total_ns - send_ns
+        is the Core round trip.
+        """
+        with self._metrics_lock:
+            return {
+                command: {'count': count, 'send_ns': send_ns, 'total_ns': total_ns}
+                for command, (count, send_ns, total_ns) in self._timings.items()
             }
-            
-            # Send as JSON + newline
-            payload = json.dumps(message) + '\n'
-            self.sock.sendall(payload.encode('utf-8'))
-            log.debug(f"Sent: {command} -> {data}")
-            
-            # Read response
-            self.sock.settimeout(READ_TIMEOUT)
-            response_data = b''
+    
+    def _send_frame(self, body: bytes, fds: Sequence[int], req_id: int) -> None:
+        """
+        Write header, request id and body with one sendmsg(2).
+        
+        The id is spliced in as its own iovec in place of the body's
+        opening brace, so the body is never copied. fds ride along as
+        SCM_RIGHTS on the first byte of the frame.
+        """
+        id_part = b'{"id":%d,' % req_id
+        rest_of_body = memoryview(body)[1:]
+        header = _FRAME_HEADER.pack(len(id_part) + len(rest_of_body))
+        parts = [header, id_part, rest_of_body]
+        ancdata = [(socket.SOL_SOCKET, socket.SCM_RIGHTS, array('i', fds))] if fds else []
+        while True:
+            try:
+                sent = self.sock.sendmsg(parts, ancdata, _SEND_FLAGS)
+                break
+            except BlockingIOError:
+                self._wait_writable()
+        total = len(header) + len(id_part) + len(rest_of_body)
+        if sent < total:
+            # Partial write on a full socket buffer: finish the frame
+            rest = memoryview(b''.join(parts))[sent:]
+            while rest:
+                try:
+                    rest = rest[self.sock.send(rest, _SEND_FLAGS):]
+                except BlockingIOError:
+                    self._wait_writable()
+    
+    def _wait_writable(self) -> None:
+        """Block until the socket can take more data; socket.timeout after READ_TIMEOUT."""
+        if not self._poller.poll(READ_TIMEOUT * 1000):
+            raise socket.timeout("timed out")
+    
+    def _read_loop(self, sock: socket.socket, pending: Dict[int, Future]) -> None:
+        """
+        Reader thread for one connection.
+        
+        Parses response frames straight from a reusable buffer and hands
+        each to the Future registered under its id. On EOF or error the
+        connection is dropped and every command still waiting on it gets
+        None.
+        """
+        poller = select.poll()
+        poller.register(sock.fileno(), select.POLLIN)
+        buf = bytearray(BUFFER_SIZE)
+        view = memoryview(buf)
+        
+        def recv_exact(n: int) -> Optional[memoryview]:
+            # Returns a view valid until the next read, or None on EOF
+            nonlocal buf, view
+            if n > len(buf):
+                buf = bytearray(n)
+                view = memoryview(buf)
+            received = 0
+            while received < n:
+                try:
+                    count = sock.recv_into(view[received:n])
+                except BlockingIOError:
+                    poller.poll()
+                    continue
+                if count == 0:
+                    return None
+                received += count
+            return view[:n]
+        
+        try:
+            while True:
+                header = recv_exact(_FRAME_HEADER.size)
+                if header is None:
+                    if pending:
+                        log.warning("Empty response from Core")
+                    break
+                
+                length = _FRAME_HEADER.unpack(header)[0]
+                if length > MAX_FRAME_SIZE:
+                    log.error("Core response too large: %s bytes", length)
+                    break
+                
+                body_view = recv_exact(length)
+                if body_view is None:
+                    log.error("Core disconnected mid-response")
+                    break
+                
+                try:
+                    response = _decode_response(body_view)
+                except _DECODE_ERRORS as e:
+                    log.error("Invalid JSON response: %s", e)
+                    _fail_unmatched(pending, None, f"Invalid JSON response: {e}")
+                    continue
+                if response.id is None:
+                    # Core can't echo an id it failed to parse
+                    _fail_unmatched(pending, response, response.error or "Reply without request id")
+                    continue
+                future = pending.pop(response.id, None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        except OSError as e:
+            log.error("IPC error: %s", e)
+        finally:
+            with self._send_lock:
+                if self.sock is sock:
+                    self._handle_disconnect()
+            sock.close()
+            for future in list(pending.values()):
+                if not future.done():
+                    future.set_result(None)
+            pending.clear()
+    
+    def _handle_disconnect(self) -> None:
+        """Handle unexpected disconnection; caller holds self._send_lock."""
+        was_connected, self.connected = self.connected, False
+        sock, self.sock = self.sock, None
+        self._poller = None
+        if sock is None:
+            return
+        if was_connected:
+            # The reader thread owns the fd once connected: shutdown()
+            # wakes it, and it closes the socket and fails the commands
+            # still waiting on this connection
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        else:
+            sock.close()
+    
+    # === TAINT UPDATE BATCHING ===
+    
+    def _enqueue(self, item) -> None:
+        """
+        Hand an item to the batch worker, starting it if needed.
+        
+        Raises RuntimeError once close() has begun.
+        """
+        with self._worker_lock:
+            if self._closing:
+                raise RuntimeError("CoreIPCClient is closed")
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._batch_worker, name='cortex-ipc-batch', daemon=True
+                )
+                self._worker.start()
+            self._queue.put(item)
+    
+    def _stop_worker(self) -> None:
+        """Send queued updates, stop the batch worker and fail what it left."""
+        with self._worker_lock:
+            # Under the lock, so every item queued before this lands ahead
+            # of the sentinel and none can be queued after it
+            self._closing = True
+            worker, self._worker = self._worker, None
+        if worker is not None and worker.is_alive():
+            self._queue.put(None)
+            worker.join(READ_TIMEOUT)
+        self._drain_queue()
+    
+    def _drain_queue(self) -> None:
+        """Resolve anything still queued once the worker is gone."""
+        dropped = 0
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, _QueuedCommand):
+                if not item.future.done():
+                    item.future.set_result(None)
+            elif isinstance(item, threading.Event):
+                item.set()
+            elif item is not None:
+                dropped += 1
+        if dropped:
+            log.warning("Core: Dropped %s taint updates left in the queue", dropped)
+    
+    def _batch_worker(self) -> None:
+        """
+        Drain queued taint updates and commands into batches.
+        
+        Waits up to BATCH_WINDOW after the first item for more to arrive,
+        keeps the highest level per PID, and sends the result as one
+        command. Queued commands ride in the same BATCH after the updates;
+        an update queued behind a command starts the next batch so it
+        can't be reordered ahead of it. A queued threading.Event is a
+        flush marker: the current batch is sent at once and the event set.
+        None stops the worker.
+        """
+        q = self._queue
+        carry = None
+        while True:
+            item = q.get() if carry is None else carry
+            carry = None
+            pending: Dict[int, int] = {}
+            commands: List[_QueuedCommand] = []
+            markers = []
+            stop = False
+            count = 0
+            deadline = time.monotonic() + BATCH_WINDOW
             
             while True:
-                chunk = self.sock.recv(BUFFER_SIZE)
-                if not chunk:
+                if item is None:
+                    stop = True
+                    break
+                if isinstance(item, threading.Event):
+                    markers.append(item)
+                    break
+                if isinstance(item, _QueuedCommand):
+                    commands.append(item)
+                elif commands:
+                    carry = item
+                    break
+                else:
+                    pid, level = item
+                    if level > pending.get(pid, -1):
+                        pending[pid] = level
+                count += 1
+                if count >= BATCH_MAX_UPDATES:
                     break
-                response_data += chunk
-                if b'\n' in chunk:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
                     break
+                try:
+                    item = q.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            
+            if pending or commands:
+                try:
+                    self._push(pending, commands)
+                except Exception as e:
+                    log.error("Core: Batch push failed: %s", e)
+                for command in commands:
+                    if not command.future.done():
+                        command.future.set_result(None)
+            for marker in markers:
+                marker.set()
+            if stop:
+                return
+    
+    def _push(self, updates: Dict[int, int], commands: List['_QueuedCommand']) -> None:
+        """
+        Send coalesced updates, then queued commands, in one round trip.
+        
+        A lone update or command goes out as itself; anything more is a
+        BATCH. Each command's future gets its CoreResponse, or None.
+        Raises RuntimeError once the client is closed.
+        """
+        if self._closed:
+            raise RuntimeError("CoreIPCClient is closed")
+        if not commands:
+            self._push_updates(updates)
+            return
+        if not updates and len(commands) == 1:
+            command = commands[0]
+            command.future.set_result(self._send_body(command.command, command.body))
+            return
+        
+        body = _BATCH_PREFIX + b','.join(
+            [_UPDATE_TAINT_BODY % item for item in updates.items()]
+            + [command.body for command in commands]
+        ) + _BATCH_SUFFIX
+        results = self._send_batch_body(body, len(updates) + len(commands))
+        if results is None:
+            if updates:
+                log.error("Core: Failed to update taint for %s PIDs", len(updates))
+            for command in commands:
+                command.future.set_result(None)
+            return
+        
+        if updates:
+            self._log_updates(updates, results)
+        for command, result in zip(commands, results[len(updates):]):
+            command.future.set_result(CoreResponse(
+                success=bool(result.get('success')),
+                error=result.get('error'),
+                data=result.get('data'),
+            ))
+    
+    def _push_updates(self, updates: Dict[int, int]) -> bool:
+        """Send coalesced updates: plain UPDATE_TAINT for one, BATCH for several."""
+        if len(updates) == 1:
+            pid, taint_level = next(iter(updates.items()))
+            response = self._send_body('UPDATE_TAINT', _UPDATE_TAINT_BODY % (pid, taint_level))
             
-            if response_data:
-                response = json.loads(response_data.decode('utf-8').strip())
-                log.debug(f"Received: {response}")
-                return response
+            if response and response.success:
+                log.info(_LOG_TAINT_OK, pid, taint_level)
+                return True
             else:
-                log.warning("Empty response from Core")
-                return None
-                
-        except socket.timeout:
-            log.error("Core response timeout")
-            self._handle_disconnect()
+                error = (response.error or 'Unknown error') if response else 'No response'
+                log.error("Core: Failed to update taint for PID %s: %s", pid, error)
+                return False
+        
+        body = _BATCH_PREFIX + b','.join([
+            _UPDATE_TAINT_BODY % item for item in updates.items()
+        ]) + _BATCH_SUFFIX
+        results = self._send_batch_body(body, len(updates))
+        if results is None:
+            log.error("Core: Failed to update taint for %s PIDs", len(updates))
+            return False
+        return self._log_updates(updates, results)
+    
+    def _log_updates(self, updates: Dict[int, int], results: List[Dict[str, Any]]) -> bool:
+        """Report BATCH results for coalesced updates; True if all applied."""
+        # One line per batch; failures are rare and still reported per PID
+        failed = 0
+        for pid, result in zip(updates, results):
+            if not result.get('success'):
+                failed += 1
+                log.error("Core: Failed to update taint for PID %s: %s",
+                          pid, result.get('error', 'Unknown error'))
+        if log.isEnabledFor(logging.INFO):
+            log.info(_LOG_BATCH_OK, len(updates) - failed, len(updates),
+                     extra={'taint_updates': updates})
+        return failed == 0
+    
+    def _send_batch(self, ops: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        """One BATCH round trip; one response per op in order, or None."""
+        return self._send_batch_body(_json_dumps({'command': 'BATCH', 'data': {'ops': ops}}), len(ops))
+    
+    def _send_batch_body(self, body: bytes, count: int) -> Optional[List[Dict[str, Any]]]:
+        response = self._send_body('BATCH', body)
+        if response is None:
             return None
-        except BrokenPipeError:
-            log.error("Core disconnected (broken pipe)")
-            self._handle_disconnect()
+        
+        results = (response.data or {}).get('results')
+        if not isinstance(results, list) or len(results) != count:
+            log.error("Core: Invalid BATCH response: %s", response.error or response)
             return None
-        except json.JSONDecodeError as e:
-            log.error(f"Invalid JSON response: {e}")
+        return results
+    
+    def _submit(self, command: str, data: Dict[str, Any]) -> Optional[CoreResponse]:
+        """Queue a command for the batch worker and wait for its response."""
+        if not self._ensure_connected():
             return None
-        except Exception as e:
-            log.error(f"IPC error: {e}")
-            self._handle_disconnect()
+        
+        queued = _QueuedCommand(command, _json_dumps({'command': command, 'data': data}))
+        self._enqueue(queued)
+        try:
+            return queued.future.result(READ_TIMEOUT)
+        except FutureTimeoutError:
+            log.error("Core: %s timed out in the send queue", command)
             return None
     
-    def _handle_disconnect(self) -> None:
-        """Handle unexpected disconnection."""
-        self.connected = False
-        if self.sock:
-            try:
-                self.sock.close()
-            except Exception:
-                pass
-            self.sock = None
+    def flush(self, timeout: float = READ_TIMEOUT) -> None:
+        """Block until every taint update queued so far has been sent."""
+        worker = self._worker
+        if worker is None or not worker.is_alive():
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
     
     # === PUBLIC COMMANDS ===
     
+    def send_batch(self, ops: List[Tuple[str, Dict[str, Any]]]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Run several commands in one round trip.
+        
+        Core runs the ops in order; a failing op does not stop the ones
+        after it.
+        
+        Args:
+            ops: (command, data) pairs
+            
+        Returns:
+            One response dict per op, or None if the batch itself failed
+        """
+        if not ops:
+            return []
+        self.flush()  # Queued taint updates go first
+        return self._send_batch([{'command': command, 'data': data} for command, data in ops])
+    
+    def pipeline(self) -> 'CommandPipeline':
+        """
+        Queue commands and send them as one BATCH when the block exits.
+        
+        Usage:
+            with client.pipeline() as pipe:
+                cleared = pipe.clear_taint(pid)
+                registered = pipe.register_agent(pid, 'python3')
+            cleared.result()  # -> response dict, or None
+        """
+        return CommandPipeline(self)
+    
     def send_update_taint(self, pid: int, taint_level: int) -> bool:
         """
-        Update taint level for a process in the BPF map.
+        Queue a taint level update for a process in the BPF map.
+        
+        Updates are coalesced (highest level per PID) and sent in batches
+        by a background thread; call flush() to wait for delivery.
         
         Args:
             pid: Process ID to update
             taint_level: New taint level (0-4)
             
         Returns:
-            True if Core acknowledged the update
+            True if the update was queued, False if Core is unreachable
         """
-        response = self._send_command('UPDATE_TAINT', {
-            'pid': pid,
-            'taint_level': taint_level
-        })
-        
-        if response and response.get('success'):
-            log.info(f"Core: Taint updated for PID {pid} -> level {taint_level}")
-            return True
-        else:
-            error = response.get('error', 'Unknown error') if response else 'No response'
-            log.error(f"Core: Failed to update taint for PID {pid}: {error}")
+        if not self._ensure_connected():
             return False
+        
+        self._enqueue((pid, taint_level))
+        return True
     
     def send_clear_taint(self, pid: int) -> bool:
         """
@@ -184,16 +832,17 @@ class CoreIPCClient:
         Returns:
             True if Core acknowledged
         """
-        response = self._send_command('CLEAR_TAINT', {
+        # Queued behind any pending updates, so none can land after the clear
+        response = self._submit('CLEAR_TAINT', {
             'pid': pid
         })
         
-        if response and response.get('success'):
-            log.info(f"Core: Taint cleared for PID {pid}")
+        if response and response.success:
+            log.info("Core: Taint cleared for PID %s", pid)
             return True
         else:
-            error = response.get('error', 'Unknown error') if response else 'No response'
-            log.error(f"Core: Failed to clear taint for PID {pid}: {error}")
+            error = (response.error or 'Unknown error') if response else 'No response'
+            log.error("Core: Failed to clear taint for PID %s: %s", pid, error)
             return False
     
     def send_register_agent(self, pid: int, comm: str = "") -> bool:
@@ -207,17 +856,62 @@ class CoreIPCClient:
         Returns:
             True if Core acknowledged
         """
-        response = self._send_command('REGISTER_AGENT', {
+        # Registration resets the entry; the queue keeps it ordered
+        response = self._submit('REGISTER_AGENT', {
             'pid': pid,
-            'comm': comm[:15] if comm else ''  # BPF comm limit is 16 chars
+            'comm': comm  # Core truncates to the 16-byte BPF comm
         })
         
-        if response and response.get('success'):
-            log.info(f"Core: Agent registered PID {pid}")
+        if response and response.success:
+            log.info("Core: Agent registered PID %s", pid)
             return True
         else:
             return False
     
+    def send_bulk_update(self, records: Iterable[Tuple[int, int]]) -> bool:
+        """
+        Apply many taint updates in one command without JSON-encoding them.
+        
+        The records are packed into a sealed memfd which is passed to Core
+        with SCM_RIGHTS; Core maps it and applies every record.
+        
+        Args:
+            records: (pid, taint_level) pairs
+            
+        Returns:
+            True if Core applied every record
+        """
+        records = list(records)
+        if not records:
+            return True
+        
+        size = len(records) * _BULK_RECORD.size
+        fd = os.memfd_create('telos-bulk', os.MFD_CLOEXEC | os.MFD_ALLOW_SEALING)
+        try:
+            os.ftruncate(fd, size)
+            with mmap.mmap(fd, size) as mm:
+                pack_into = _BULK_RECORD.pack_into
+                offset = 0
+                for pid, taint_level in records:
+                    pack_into(mm, offset, pid, taint_level)
+                    offset += _BULK_RECORD.size
+            # Core only reads; seal so the contents can't change under it
+            fcntl.fcntl(fd, fcntl.F_ADD_SEALS, _BULK_SEALS)
+            
+            self.flush()  # Queued taint updates go first
+            response = self._send_body(
+                'BULK_FD', _json_dumps({'command': 'BULK_FD', 'data': {'count': len(records)}}), (fd,))
+        finally:
+            os.close(fd)
+        
+        if response and response.success:
+            log.info("Core: Bulk update applied %s records", len(records))
+            return True
+        else:
+            error = (response.error or 'Unknown error') if response else 'No response'
+            log.error("Core: Bulk update failed: %s", error)
+            return False
+    
     def get_state(self) -> Optional[Dict[str, Any]]:
         """
         Get current state from Core (for debugging).
@@ -225,13 +919,276 @@ class CoreIPCClient:
         Returns:
             State dict or None
         """
-        response = self._send_command('GET_STATE', {})
+        response = self._submit('GET_STATE', {})
         
-        if response and response.get('success'):
-            return response.get('data', {})
+        if response and response.success:
+            return response.data or {}
         return None
     
     def ping(self) -> bool:
         """Check if Core is responsive."""
-        response = self._send_command('PING', {})
-        return response is not None and response.get('success', False)
+        response = self._submit('PING', {})
+        return response is not None and response.success
+
+
+class CommandPipeline:
+    """
+    Commands collected for a single BATCH round trip.
+    
+    Each call returns a Future that resolves to that op's response dict,
+    or to None if the batch as a whole failed. Futures are cancelled if
+    the with-block raises.
+    """
+    
+    def __init__(self, client: CoreIPCClient):
+        self._client = client
+        self._ops: List[Tuple[str, Dict[str, Any]]] = []
+        self._futures: List[Future] = []
+    
+    def __enter__(self) -> 'CommandPipeline':
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if exc_type is None:
+            self.execute()
+        else:
+            for future in self._futures:
+                future.cancel()
+            self._ops, self._futures = [], []
+        return False
+    
+    def add(self, command: str, data: Dict[str, Any]) -> Future:
+        """Queue one command."""
+        future: Future = Future()
+        self._ops.append((command, data))
+        self._futures.append(future)
+        return future
+    
+    def update_taint(self, pid: int, taint_level: int) -> Future:
+        return self.add('UPDATE_TAINT', {'pid': pid, 'taint_level': taint_level})
+    
+    def clear_taint(self, pid: int) -> Future:
+        return self.add('CLEAR_TAINT', {'pid': pid})
+    
+    def register_agent(self, pid: int, comm: str = "") -> Future:
+        return self.add('REGISTER_AGENT', {'pid': pid, 'comm': comm})
+    
+    def execute(self) -> None:
+        """Send everything queued so far and resolve its futures."""
+        ops, futures = self._ops, self._futures
+        self._ops, self._futures = [], []
+        if not ops:
+            return
+        
+        results = self._client.send_batch(ops)
+        for i, future in enumerate(futures):
+            future.set_result(results[i] if results is not None else None)
+
+
+# === ASYNCIO CLIENT ===
+
+class _CoreProtocol(asyncio.BufferedProtocol):
+    """
+    Receives length-prefixed frames straight into one reusable buffer.
+    
+    Each connection gets its own protocol, which matches replies to
+    requests by id and fails its own waiters when the connection is lost,
+    so a late connection_lost can't touch a newer connection's requests.
+    """
+    
+    def __init__(self):
+        # Requests awaiting a reply on this connection, by id
+        self.pending: Dict[int, asyncio.Future] = {}
+        self._buf = bytearray(BUFFER_SIZE)
+        self._view = memoryview(self._buf)
+        self._end = 0
+        self.transport: Optional[asyncio.Transport] = None
+    
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = transport
+    
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        self.transport = None
+        if exc is not None:
+            log.error("Core disconnected: %s", exc)
+        pending, self.pending = self.pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_result(None)
+    
+    def _on_frame(self, body: memoryview) -> None:
+        pending = self.pending
+        try:
+            response = _decode_response(body)
+        except _DECODE_ERRORS as e:
+            log.error("Invalid JSON response: %s", e)
+            _fail_unmatched(pending, None, f"Invalid JSON response: {e}")
+            return
+        if response.id is None:
+            # Core can't echo an id it failed to parse
+            _fail_unmatched(pending, response, response.error or "Reply without request id")
+            return
+        future = pending.pop(response.id, None)
+        if future is not None and not future.done():
+            future.set_result(response)
+    
+    def _grow(self, size: int) -> None:
+        buf = bytearray(size)
+        buf[:self._end] = self._view[:self._end]
+        self._buf, self._view = buf, memoryview(buf)
+    
+    def get_buffer(self, sizehint: int) -> memoryview:
+        if self._end == len(self._buf):
+            self._grow(len(self._buf) * 2)
+        return self._view[self._end:]
+    
+    def buffer_updated(self, nbytes: int) -> None:
+        self._end += nbytes
+        view, end, start = self._view, self._end, 0
+        
+        while end - start >= _FRAME_HEADER.size:
+            length = _FRAME_HEADER.unpack_from(view, start)[0]
+            if length > MAX_FRAME_SIZE:
+                log.error("Core response too large: %s bytes", length)
+                self.transport.close()
+                return
+            frame_end = start + _FRAME_HEADER.size + length
+            if frame_end > end:
+                if frame_end - start > len(self._buf):
+                    # Make room for the whole frame once it is compacted
+                    self._grow(frame_end - start)
+                    view = self._view
+                break
+            self._on_frame(view[start + _FRAME_HEADER.size:frame_end])
+            start = frame_end
+        
+        # Move any partial frame to the front
+        if start:
+            remaining = end - start
+            view[:remaining] = view[start:end]
+            self._end = remaining
+
+
+class AsyncCoreIPCClient:
+    """
+    asyncio counterpart of CoreIPCClient for event-loop callers.
+    
+    Requests carry an increasing id and are written without waiting for
+    earlier replies, so many commands can be in flight on one connection.
+    Same return conventions as CoreIPCClient: None / False on failure.
+    """
+    
+    def __init__(self, socket_path: str = DEFAULT_SOCKET_PATH):
+        self.socket_path = socket_path
+        self._protocol: Optional[_CoreProtocol] = None
+        # Concurrent callers that find no connection open one between them
+        self._connect_lock = asyncio.Lock()
+        self._ids = itertools.count(1)
+    
+    @property
+    def connected(self) -> bool:
+        return self._protocol is not None and self._protocol.transport is not None
+    
+    async def connect(self) -> bool:
+        """Establish connection to the Core daemon. Returns True if connected."""
+        async with self._connect_lock:
+            if self.connected:
+                return True
+            loop = asyncio.get_running_loop()
+            try:
+                _, self._protocol = await asyncio.wait_for(
+                    loop.create_unix_connection(_CoreProtocol, path=self.socket_path),
+                    CONNECT_TIMEOUT
+                )
+                log.info("Connected to Core at %s", self.socket_path)
+                return True
+            except FileNotFoundError:
+                log.warning("Core socket not found: %s", self.socket_path)
+            except ConnectionRefusedError:
+                log.warning("Core connection refused: %s", self.socket_path)
+            except Exception as e:
+                log.error("Core connection failed: %s", e)
+            self._protocol = None
+            return False
+    
+    def close(self) -> None:
+        """Close the connection; in-flight commands resolve to None."""
+        if self.connected:
+            self._protocol.transport.close()
+        self._protocol = None
+    
+    async def _send_command(self, command: str, data: Dict[str, Any]) -> Optional[CoreResponse]:
+        """Send a command and wait for its response. Returns None on failure."""
+        if not self.connected and not await self.connect():
+            return None
+        
+        protocol = self._protocol
+        req_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        protocol.pending[req_id] = future
+        
+        body = _json_dumps({'id': req_id, 'command': command, 'data': data})
+        protocol.transport.writelines([_FRAME_HEADER.pack(len(body)), body])
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Sent: %s -> %s", command, data)
+        
+        try:
+            return await asyncio.wait_for(future, READ_TIMEOUT)
+        except asyncio.TimeoutError:
+            protocol.pending.pop(req_id, None)
+            log.error("Core response timeout")
+            return None
+    
+    # === PUBLIC COMMANDS ===
+    
+    async def send_update_taint(self, pid: int, taint_level: int) -> bool:
+        """Update taint level for a process. True if Core acknowledged."""
+        response = await self._send_command('UPDATE_TAINT', {
+            'pid': pid,
+            'taint_level': taint_level
+        })
+        
+        if response and response.success:
+            log.info(_LOG_TAINT_OK, pid, taint_level)
+            return True
+        else:
+            error = (response.error or 'Unknown error') if response else 'No response'
+            log.error("Core: Failed to update taint for PID %s: %s", pid, error)
+            return False
+    
+    async def send_clear_taint(self, pid: int) -> bool:
+        """Clear taint for a process. True if Core acknowledged."""
+        response = await self._send_command('CLEAR_TAINT', {'pid': pid})
+        
+        if response and response.success:
+            log.info("Core: Taint cleared for PID %s", pid)
+            return True
+        else:
+            error = (response.error or 'Unknown error') if response else 'No response'
+            log.error("Core: Failed to clear taint for PID %s: %s", pid, error)
+            return False
+    
+    async def send_register_agent(self, pid: int, comm: str = "") -> bool:
+        """Register an agent process. True if Core acknowledged."""
+        response = await self._send_command('REGISTER_AGENT', {
+            'pid': pid,
+            'comm': comm  # Core truncates to the 16-byte BPF comm
+        })
+        
+        if response and response.success:
+            log.info("Core: Agent registered PID %s", pid)
+            return True
+        return False
+    
+    async def get_state(self) -> Optional[Dict[str, Any]]:
+        """Get current state from Core (for debugging)."""
+        response = await self._send_command('GET_STATE', {})
+        
+        if response and response.success:
+            return response.data or {}
+        return None
+    
+    async def ping(self) -> bool:
+        """Check if Core is responsive."""
+        response = await self._send_command('PING', {})
+        return response is not None and response.success
@@ -0,0 +1,223 @@
+"""
+Telos Taint Ring - Shared-Memory Taint Transport
+
+Lock-free single-producer/single-consumer ring buffer in /dev/shm that
+carries taint reports from the Native Host to Cortex without gRPC,
+HTTP/2 or loopback TCP on the hot path. gRPC remains the control plane
+and the fallback whenever the ring is missing, full or owned by another
+producer.
+
+Layout (little-endian):
+    Header (HEADER_SIZE bytes):
+        [0:4)    magic      RING_MAGIC, written by Cortex on create
+        [4:8)    slots      number of record slots (power of two)
+        [8:12)   head       next index the producer writes (producer-owned)
+        [12:16)  tail       next index the consumer reads (consumer-owned)
+        [16:20)  closed     set to 1 by Cortex on shutdown
+    Records (RECORD_SIZE bytes each):
+        source_id[32] | url[64] | level u8 | payload_preview[31]
+
+head and tail are free-running u32 counters; slot = index % slots. Each
+side only ever stores its own index, and the producer publishes a record
+by storing head after the record bytes, so no CAS is needed. This relies
+on aligned 4-byte stores being atomic and on x86-64 store ordering, so
+the ring is only created on x86-64; elsewhere both sides use gRPC.
+Strings are NUL-padded and truncated to their field width in bytes.
+"""
+
+import errno
+import fcntl
+import grp
+import logging
+import mmap
+import os
+import platform
+import struct
+from typing import List, Optional, Tuple
+
+log = logging.getLogger('telos.ring')
+
+RING_PATH = '/dev/shm/telos_taint_ring'
+RING_GROUP = 'telos'  # Native Host users must be in this group to attach
+RING_MODE = 0o660
+# Without TSO the consumer could see head move before the record bytes
+RING_SUPPORTED = platform.machine() in ('x86_64', 'AMD64')
+RING_MAGIC = 0x31524C54  # "TLR1"
+RING_SLOTS = 8192
+HEADER_SIZE = 128
+RECORD_SIZE = 128
+RING_SIZE = HEADER_SIZE + RING_SLOTS * RECORD_SIZE
+
+_U32 = struct.Struct('<I')
+_HEADER = struct.Struct('<IIIII')
+_RECORD = struct.Struct('<32s64sB31s')
+
+_OFF_SLOTS = 4
+_OFF_HEAD = 8
+_OFF_TAIL = 12
+_OFF_CLOSED = 16
+_U32_MASK = 0xFFFFFFFF
+
+# (source_id, url, level, payload_preview)
+TaintRecord = Tuple[str, str, int, str]
+
+
+def _decode(field: bytes) -> str:
+    return field.rstrip(b'\0').decode('utf-8', 'ignore')
+
+
+class TaintRingReader:
+    """
+    Consumer side of the taint ring, owned by Cortex.
+
+    Creates (or resets) the ring file and drains records on request.
+    """
+
+    def __init__(self, path: str = RING_PATH, group: str = RING_GROUP):
+        if not RING_SUPPORTED:
+            raise OSError(errno.ENOTSUP,
+                          f"taint ring needs x86-64 store ordering, not {platform.machine()}")
+        self.path = path
+        # Cortex runs as root in a world-writable directory: never reuse
+        # whatever is at the path (it may be a planted symlink), always
+        # create a fresh file
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_EXCL | os.O_NOFOLLOW, RING_MODE)
+        try:
+            try:
+                os.fchown(self._fd, -1, grp.getgrnam(group).gr_gid)
+            except KeyError:
+                log.warning("Group %s not found; taint ring is owner-only", group)
+            # Bypass the umask so group members can write
+            os.fchmod(self._fd, RING_MODE)
+            os.ftruncate(self._fd, RING_SIZE)
+            self._mm = mmap.mmap(self._fd, RING_SIZE)
+        except OSError:
+            os.close(self._fd)
+            os.unlink(path)
+            raise
+        self._slots = RING_SLOTS
+        _HEADER.pack_into(self._mm, 0, RING_MAGIC, RING_SLOTS, 0, 0, 0)
+        log.info("Taint ring created at %s (%d slots)", path, RING_SLOTS)
+
+    def drain(self, max_records: int = 256) -> List[TaintRecord]:
+        """Pop up to max_records pending records, oldest first."""
+        mm = self._mm
+        head = _U32.unpack_from(mm, _OFF_HEAD)[0]
+        tail = _U32.unpack_from(mm, _OFF_TAIL)[0]
+        count = min((head - tail) & _U32_MASK, max_records)
+        if count == 0:
+            return []
+
+        records = []
+        for i in range(count):
+            offset = HEADER_SIZE + ((tail + i) % self._slots) * RECORD_SIZE
+            source_id, url, level, preview = _RECORD.unpack_from(mm, offset)
+            records.append((_decode(source_id), _decode(url), level, _decode(preview)))
+
+        _U32.pack_into(mm, _OFF_TAIL, (tail + count) & _U32_MASK)
+        return records
+
+    def close(self) -> None:
+        """Mark the ring closed so producers fall back to gRPC, then remove it."""
+        if self._mm is None:
+            return
+        _U32.pack_into(self._mm, _OFF_CLOSED, 1)
+        self._mm.close()
+        self._mm = None
+        os.close(self._fd)
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+        log.debug("Taint ring closed")
+
+
+class TaintRingWriter:
+    """
+    Producer side of the taint ring, used by the Native Host.
+
+    Only one producer may attach at a time; this is enforced with an
+    exclusive flock on the ring file.
+    """
+
+    def __init__(self, fd: int, mm: mmap.mmap, slots: int):
+        self._fd = fd
+        self._mm = mm
+        self._slots = slots
+
+    @classmethod
+    def attach(cls, path: str = RING_PATH) -> Optional['TaintRingWriter']:
+        """
+        Attach to a ring created by Cortex.
+
+        Returns None if there is no usable ring or another producer holds it.
+        """
+        if not RING_SUPPORTED:
+            return None
+        try:
+            fd = os.open(path, os.O_RDWR | os.O_NOFOLLOW)
+        except OSError:
+            return None
+
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            if os.fstat(fd).st_size < RING_SIZE:
+                raise ValueError("ring file too small")
+            mm = mmap.mmap(fd, RING_SIZE)
+            magic, slots, _, _, closed = _HEADER.unpack_from(mm, 0)
+            if magic != RING_MAGIC or slots != RING_SLOTS or closed:
+                mm.close()
+                raise ValueError("ring header mismatch or closed")
+        except (OSError, ValueError) as e:
+            log.debug("Taint ring unavailable: %s", e)
+            os.close(fd)
+            return None
+
+        return cls(fd, mm, slots)
+
+    def replaced(self) -> bool:
+        """True once the ring file has been unlinked, e.g. by a restarted Cortex."""
+        return os.fstat(self._fd).st_nlink == 0
+
+    def push(self, source_id: str, url: str, level: int, payload_preview: str) -> bool:
+        """
+        Publish one record.
+
+        Returns False if the ring is full, Cortex has closed it, or a
+        restarted Cortex has replaced it (ours is unlinked and nobody
+        drains it any more); the caller should re-attach and deliver the
+        report another way.
+        """
+        mm = self._mm
+        if _U32.unpack_from(mm, _OFF_CLOSED)[0]:
+            return False
+        if self.replaced():
+            return False
+
+        head = _U32.unpack_from(mm, _OFF_HEAD)[0]
+        tail = _U32.unpack_from(mm, _OFF_TAIL)[0]
+        if (head - tail) & _U32_MASK >= self._slots:
+            return False
+
+        offset = HEADER_SIZE + (head % self._slots) * RECORD_SIZE
+        _RECORD.pack_into(
+            mm, offset,
+            source_id.encode('utf-8')[:32],
+            url.encode('utf-8')[:64],
+            level & 0xFF,
+            payload_preview.encode('utf-8')[:31]
+        )
+        _U32.pack_into(mm, _OFF_HEAD, (head + 1) & _U32_MASK)
+        return True
+
+    def close(self) -> None:
+        """Detach from the ring and release the producer lock."""
+        if self._mm is None:
+            return
+        self._mm.close()
+        self._mm = None
+        os.close(self._fd)
@@ -16,9 +16,11 @@ package main
 
 import (
 	"bufio"
+	"encoding/binary"
 	"encoding/json"
 	"flag"
 	"fmt"
+	"io"
 	"log"
 	"net"
 	"os"
@@ -37,6 +39,15 @@ const (
 	defaultSocketPath = "/var/run/telos.sock"
 	defaultBPFObj     = "bin/bpf_lsm.o"
 	bpfPinPath        = "/sys/fs/bpf/telos"
+
+	// IPC frames are a 4-byte big-endian length followed by a JSON body
+	frameHeaderSize = 4
+	maxFrameSize    = 16 << 20
+
+	// BULK_FD records: pid uint32 big-endian + taint level uint8
+	bulkRecordSize = 5
+	maxBulkRecords = 1 << 20
+	maxPassedFDs   = 16 // Per recvmsg
 )
 
 // Taint levels (must match common_maps.h)
@@ -67,15 +78,17 @@ type Config struct {
 
 // IPCCommand is the JSON command from Cortex
 type IPCCommand struct {
+	ID      json.RawMessage        `json:"id,omitempty"`
 	Command string                 `json:"command"`
 	Data    map[string]interface{} `json:"data"`
 }
 
 // IPCResponse is the JSON response to Cortex
 type IPCResponse struct {
-	Success bool        `json:"success"`
-	Error   string      `json:"error,omitempty"`
-	Data    interface{} `json:"data,omitempty"`
+	ID      json.RawMessage `json:"id,omitempty"`
+	Success bool            `json:"success"`
+	Error   string          `json:"error,omitempty"`
+	Data    interface{}     `json:"data,omitempty"`
 }
 
 // === BPF OBJECTS ===
@@ -307,18 +320,40 @@ func (d *TelosDaemon) acceptConnections() {
 func (d *TelosDaemon) handleConnection(conn net.Conn) {
 	defer conn.Close()
 
-	reader := bufio.NewReader(conn)
+	// Keep SCM_RIGHTS fds that arrive with the stream for BULK_FD
+	var source io.Reader = conn
+	var fds *fdConn
+	if uc, ok := conn.(*net.UnixConn); ok {
+		fds = &fdConn{conn: uc, oob: make([]byte, syscall.CmsgSpace(4*maxPassedFDs))}
+		defer fds.closeAll()
+		source = fds
+	}
+
+	reader := bufio.NewReader(source)
+	var header [frameHeaderSize]byte
+	var body []byte
 
 	for {
-		// Read JSON line
-		line, err := reader.ReadBytes('\n')
-		if err != nil {
+		// Read length-prefixed frame
+		if _, err := io.ReadFull(reader, header[:]); err != nil {
 			return // Connection closed
 		}
+		length := binary.BigEndian.Uint32(header[:])
+		if length > maxFrameSize {
+			log.Printf("[IPC] Frame too large (%d bytes), closing connection", length)
+			return
+		}
+		if uint32(cap(body)) < length {
+			body = make([]byte, length)
+		}
+		body = body[:length]
+		if _, err := io.ReadFull(reader, body); err != nil {
+			return
+		}
 
 		// Parse command
 		var cmd IPCCommand
-		if err := json.Unmarshal(line, &cmd); err != nil {
+		if err := json.Unmarshal(body, &cmd); err != nil {
 			d.sendResponse(conn, IPCResponse{
 				Success: false,
 				Error:   "Invalid JSON: " + err.Error(),
@@ -326,12 +361,58 @@ func (d *TelosDaemon) handleConnection(conn net.Conn) {
 			continue
 		}
 
-		// Handle command
-		resp := d.handleCommand(cmd)
+		// Handle command; echo the request id so pipelined clients can match replies
+		var resp IPCResponse
+		if cmd.Command == "BULK_FD" {
+			resp = d.cmdBulkFD(cmd.Data, fds)
+		} else {
+			resp = d.handleCommand(cmd)
+		}
+		resp.ID = cmd.ID
 		d.sendResponse(conn, resp)
 	}
 }
 
+// fdConn reads a Unix socket stream and keeps any file descriptors passed
+// with SCM_RIGHTS, in arrival order, until a command takes them.
+type fdConn struct {
+	conn *net.UnixConn
+	oob  []byte
+	fds  []int
+}
+
+func (c *fdConn) Read(p []byte) (int, error) {
+	n, oobn, _, _, err := c.conn.ReadMsgUnix(p, c.oob)
+	if oobn > 0 {
+		msgs, perr := syscall.ParseSocketControlMessage(c.oob[:oobn])
+		if perr == nil {
+			for i := range msgs {
+				if fds, ferr := syscall.ParseUnixRights(&msgs[i]); ferr == nil {
+					c.fds = append(c.fds, fds...)
+				}
+			}
+		}
+	}
+	return n, err
+}
+
+// take returns the oldest unclaimed fd
+func (c *fdConn) take() (int, bool) {
+	if len(c.fds) == 0 {
+		return -1, false
+	}
+	fd := c.fds[0]
+	c.fds = c.fds[1:]
+	return fd, true
+}
+
+func (c *fdConn) closeAll() {
+	for _, fd := range c.fds {
+		syscall.Close(fd)
+	}
+	c.fds = nil
+}
+
 // handleCommand dispatches commands to handlers
 func (d *TelosDaemon) handleCommand(cmd IPCCommand) IPCResponse {
 	switch cmd.Command {
@@ -350,6 +431,9 @@ func (d *TelosDaemon) handleCommand(cmd IPCCommand) IPCResponse {
 	case "GET_STATE":
 		return d.cmdGetState()
 
+	case "BATCH":
+		return d.cmdBatch(cmd.Data)
+
 	default:
 		return IPCResponse{
 			Success: false,
@@ -358,6 +442,94 @@ func (d *TelosDaemon) handleCommand(cmd IPCCommand) IPCResponse {
 	}
 }
 
+// cmdBatch runs a list of commands in order and returns every result.
+// A failing op does not stop the ones after it.
+func (d *TelosDaemon) cmdBatch(data map[string]interface{}) IPCResponse {
+	ops, ok := data["ops"].([]interface{})
+	if !ok {
+		return IPCResponse{Success: false, Error: "Missing or invalid 'ops'"}
+	}
+
+	results := make([]IPCResponse, len(ops))
+	success := true
+	for i, raw := range ops {
+		op, _ := raw.(map[string]interface{})
+		command, _ := op["command"].(string)
+		opData, _ := op["data"].(map[string]interface{})
+
+		if command == "BATCH" {
+			results[i] = IPCResponse{Success: false, Error: "Nested BATCH not allowed"}
+		} else {
+			results[i] = d.handleCommand(IPCCommand{Command: command, Data: opData})
+		}
+		if !results[i].Success {
+			success = false
+		}
+	}
+
+	return IPCResponse{
+		Success: success,
+		Data:    map[string]interface{}{"results": results},
+	}
+}
+
+// cmdBulkFD applies taint updates packed into a memfd that arrived with
+// the command via SCM_RIGHTS, so the records never cross the socket.
+func (d *TelosDaemon) cmdBulkFD(data map[string]interface{}, fds *fdConn) IPCResponse {
+	if fds == nil {
+		return IPCResponse{Success: false, Error: "BULK_FD requires a Unix socket"}
+	}
+	fd, ok := fds.take()
+	if !ok {
+		return IPCResponse{Success: false, Error: "BULK_FD sent without a file descriptor"}
+	}
+	defer syscall.Close(fd)
+
+	countFloat, ok := data["count"].(float64)
+	if !ok || countFloat < 0 || countFloat > maxBulkRecords {
+		return IPCResponse{Success: false, Error: "Missing or invalid 'count'"}
+	}
+	count := int(countFloat)
+	if count == 0 {
+		return IPCResponse{Success: true, Data: map[string]interface{}{"applied": 0}}
+	}
+	size := count * bulkRecordSize
+
+	var st syscall.Stat_t
+	if err := syscall.Fstat(fd, &st); err != nil {
+		return IPCResponse{Success: false, Error: err.Error()}
+	}
+	if st.Size < int64(size) {
+		return IPCResponse{Success: false, Error: "BULK_FD file shorter than 'count' records"}
+	}
+
+	buf, err := syscall.Mmap(fd, 0, size, syscall.PROT_READ, syscall.MAP_SHARED)
+	if err != nil {
+		return IPCResponse{Success: false, Error: err.Error()}
+	}
+	defer syscall.Munmap(buf)
+
+	applied := 0
+	for off := 0; off < size; off += bulkRecordSize {
+		pid := binary.BigEndian.Uint32(buf[off:])
+		info := ProcessInfo{
+			PID:        pid,
+			TaintLevel: uint32(buf[off+4]),
+		}
+		if err := d.maps.ProcessMap.Put(pid, info); err != nil {
+			log.Printf("[BULK] PID %d: %v", pid, err)
+			continue
+		}
+		applied++
+	}
+
+	log.Printf("[BULK] Applied %d/%d taint updates", applied, count)
+	return IPCResponse{
+		Success: applied == count,
+		Data:    map[string]interface{}{"applied": applied},
+	}
+}
+
 // cmdUpdateTaint updates taint level for a PID
 func (d *TelosDaemon) cmdUpdateTaint(data map[string]interface{}) IPCResponse {
 	pidFloat, ok := data["pid"].(float64)
@@ -419,10 +591,10 @@ func (d *TelosDaemon) cmdRegisterAgent(data map[string]interface{}) IPCResponse
 		TaintLevel: TaintClean,
 	}
 
-	// Copy comm name
-	if comm != "" {
-		copy(info.Comm[:], []byte(comm))
-	}
+	// Copy comm name; BPF comm is 16 bytes, keep the last one as NUL.
+	// Truncating here, in bytes, is what the kernel does, so clients
+	// can send the name as-is.
+	copy(info.Comm[:len(info.Comm)-1], comm)
 
 	if err := d.maps.ProcessMap.Put(pid, info); err != nil {
 		return IPCResponse{Success: false, Error: err.Error()}
@@ -454,11 +626,13 @@ func (d *TelosDaemon) cmdGetState() IPCResponse {
 	return IPCResponse{Success: true, Data: state}
 }
 
-// sendResponse writes a JSON response to the connection
+// sendResponse writes a length-prefixed JSON response to the connection
 func (d *TelosDaemon) sendResponse(conn net.Conn, resp IPCResponse) {
 	data, _ := json.Marshal(resp)
-	conn.Write(data)
-	conn.Write([]byte("\n"))
+	frame := make([]byte, frameHeaderSize+len(data))
+	binary.BigEndian.PutUint32(frame, uint32(len(data)))
+	copy(frame[frameHeaderSize:], data)
+	conn.Write(frame)
 }
 
 // Stop gracefully shuts down the daemon